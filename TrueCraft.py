@@ -5,12 +5,11 @@ from utils.database_factory import create_database_service
 from utils.auth_manager import AuthManager
 from utils.config import get_public_url
 from utils.i18n import i18n, t
-from utils.ai_assistant import AIAssistant
+from utils.ai_ui_components import get_shared_ai_assistant
 
 # Initialize AI Assistant for chatbot
-@st.cache_resource
 def get_ai_assistant():
-    return AIAssistant()
+    return get_shared_ai_assistant()
 
 # Initialize database service with new portable system
 @st.cache_resource
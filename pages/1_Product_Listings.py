@@ -3,10 +3,9 @@ import pandas as pd
 from datetime import datetime
 import base64
 import io
-from utils.ai_assistant import AIAssistant
 from utils.database_factory import create_database_service
 from utils.image_handler import ImageHandler
-from utils.ai_ui_components import AIUIComponents, render_ai_business_toolkit, render_seo_title_generator, render_pricing_analyzer, render_photography_tips_generator, render_seasonal_marketing_generator
+from utils.ai_ui_components import AIUIComponents, get_shared_ai_assistant, render_ai_business_toolkit, render_seo_title_generator, render_pricing_analyzer, render_photography_tips_generator, render_seasonal_marketing_generator
 from utils.i18n import i18n, t
 
 # Initialize components
@@ -18,14 +17,11 @@ db_manager = get_database_service()
 
 # Initialize AI components safely
 def get_ai_assistant():
-    """Get AI assistant with error handling"""
-    try:
-        if 'ai_assistant' not in st.session_state:
-            st.session_state.ai_assistant = AIAssistant()
-        return st.session_state.ai_assistant
-    except Exception as e:
+    """Get the AI assistant shared across sessions and pages"""
+    ai_assistant = get_shared_ai_assistant()
+    if ai_assistant is None:
         st.warning(t("ai_features_unavailable"))
-        return None
+    return ai_assistant
 
 image_handler = ImageHandler()
 ai_ui = AIUIComponents()
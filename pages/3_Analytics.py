@@ -5,7 +5,19 @@ import plotly.graph_objects as go
 import numpy as np
 from datetime import datetime, timedelta
 from utils.database_factory import create_database_service
-from utils.ai_assistant import AIAssistant
+from utils.ai_ui_components import cached_ai_text, get_shared_ai_assistant
+
+# Sample SDG data (in real implementation, this would come from actual assessments)
+SDG_DATA = {
+    'SDG 1': {'name': 'No Poverty', 'score': 75, 'contribution': 'Providing fair income to artisans'},
+    'SDG 5': {'name': 'Gender Equality', 'score': 85, 'contribution': 'Supporting women artisans'},
+    'SDG 8': {'name': 'Decent Work', 'score': 90, 'contribution': 'Creating quality employment'},
+    'SDG 10': {'name': 'Reduced Inequalities', 'score': 80, 'contribution': 'Fair trade practices'},
+    'SDG 11': {'name': 'Sustainable Cities', 'score': 70, 'contribution': 'Supporting local communities'},
+    'SDG 12': {'name': 'Responsible Consumption', 'score': 95, 'contribution': 'Handmade, sustainable products'}
+}
+SDG_KEYS = np.array(list(SDG_DATA))
+SDG_SCORES = np.array([v['score'] for v in SDG_DATA.values()], dtype=np.int8)
 
 # Initialize components
 @st.cache_resource
@@ -14,6 +26,15 @@ def get_database_service():
 
 db_manager = get_database_service()
 
+@st.cache_data(ttl=3600)
+def get_sdg_progress(month_key, avg_score):
+    """Simulated monthly SDG score series; month_key keeps it cached for the current month"""
+    dates = pd.date_range(start='2024-01-01', end=datetime.now(), freq='ME')
+    return pd.DataFrame({
+        'Date': dates,
+        'Overall SDG Score': (avg_score - 20) + 3.0 * np.arange(len(dates), dtype=np.float32)
+    })
+
 st.set_page_config(
     page_title="Analytics - TrueCraft",
     page_icon="📊",
@@ -61,6 +82,24 @@ elif time_filter == "Today":
     today = current_date.date()
     filtered_df = filtered_df[filtered_df['created_at'].dt.date == today]
 
+# Categories present after filtering, shared by the AI report and sustainability sections
+unique_categories = tuple(sorted(filtered_df['category'].unique()))
+category_set = frozenset(unique_categories)
+
+# Column reductions computed once and shared by the KPI, detail and business sections
+views_arr = filtered_df['views'].fillna(0).to_numpy(dtype=np.int64)
+favorites_arr = filtered_df['favorites'].fillna(0).to_numpy(dtype=np.int64)
+price_arr = filtered_df['price'].dropna().to_numpy(dtype=float)
+stats = {
+    'views_sum': int(views_arr.sum()),
+    'views_max': int(views_arr.max(initial=0)),
+    'favorites_sum': int(favorites_arr.sum()),
+    'favorites_max': int(favorites_arr.max(initial=0)),
+    'price_sum': float(price_arr.sum()),
+    'price_mean': float(price_arr.mean()) if price_arr.size else 0.0,
+    'price_std': float(price_arr.std(ddof=1)) if price_arr.size > 1 else float('nan')
+}
+
 # Main metrics
 st.subheader("🎯 Key Performance Metrics")
 
@@ -75,7 +114,7 @@ with col1:
     )
 
 with col2:
-    total_views = filtered_df['views'].sum() if not filtered_df.empty else 0
+    total_views = stats['views_sum']
     avg_views = total_views / total_products if total_products > 0 else 0
     st.metric(
         "Total Views",
@@ -84,7 +123,7 @@ with col2:
     )
 
 with col3:
-    total_favorites = filtered_df['favorites'].sum() if not filtered_df.empty else 0
+    total_favorites = stats['favorites_sum']
     st.metric(
         "Total Favorites",
         total_favorites,
@@ -92,15 +131,17 @@ with col3:
     )
 
 with col4:
-    total_value = filtered_df['price'].sum() if not filtered_df.empty else 0
-    avg_price = filtered_df['price'].mean() if not filtered_df.empty else 0
+    total_value = stats['price_sum']
+    avg_price = stats['price_mean']
     st.metric(
         "Portfolio Value",
         f"${total_value:,.2f}",
         delta=f"Avg: ${avg_price:.2f}"
     )
 
-if not filtered_df.empty:
+@st.fragment
+def render_detailed_analytics(filtered_df, stats):
+    """Charts, performance table, insights and exports; reruns on its own for in-section widgets"""
     # Charts row
     col1, col2 = st.columns(2)
     
@@ -155,22 +196,29 @@ if not filtered_df.empty:
     st.subheader("💰 Pricing Analysis")
     col1, col2 = st.columns(2)
     
+    # Cap the rows serialized to the browser for large catalogs
+    plot_df = filtered_df if len(filtered_df) <= 5000 else filtered_df.sample(5000, random_state=0)
+    
     with col1:
-        # Price distribution
-        fig_price_dist = px.histogram(
-            filtered_df,
-            x='price',
-            nbins=20,
+        # Price distribution (binned here so only the bar heights are sent)
+        price_counts, price_edges = np.histogram(filtered_df['price'].dropna().to_numpy(dtype=float), bins=20)
+        fig_price_dist = go.Figure(data=go.Bar(
+            x=(price_edges[:-1] + price_edges[1:]) / 2,
+            y=price_counts,
+            width=np.diff(price_edges)
+        ))
+        fig_price_dist.update_layout(
             title="Price Distribution",
-            labels={'price': 'Price ($)', 'count': 'Number of Products'}
+            xaxis_title="Price ($)",
+            yaxis_title="Number of Products",
+            height=300
         )
-        fig_price_dist.update_layout(height=300)
         st.plotly_chart(fig_price_dist, use_container_width=True)
     
     with col2:
         # Price vs Views scatter
         fig_price_views = px.scatter(
-            filtered_df,
+            plot_df,
             x='price',
             y='views',
             size='favorites',
@@ -185,22 +233,21 @@ if not filtered_df.empty:
     st.subheader("🏆 Product Performance Details")
     
     # Create performance score
-    if not filtered_df.empty:
-        max_views = filtered_df['views'].max() if filtered_df['views'].max() > 0 else 1
-        max_favorites = filtered_df['favorites'].max() if filtered_df['favorites'].max() > 0 else 1
-        
-        filtered_df['performance_score'] = (
-            (filtered_df['views'] / max_views * 0.7) + 
-            (filtered_df['favorites'] / max_favorites * 0.3)
-        ) * 100
+    views = filtered_df['views'].fillna(0).to_numpy(dtype=np.float32)
+    favorites = filtered_df['favorites'].fillna(0).to_numpy(dtype=np.float32)
+    max_views = stats['views_max'] or 1
+    max_favorites = stats['favorites_max'] or 1
+    
+    score = (views / max_views * 0.7 + favorites / max_favorites * 0.3) * 100
+    filtered_df['performance_score'] = score
     
-    # Display table
+    # Display table, ordered by score without re-sorting every column
     display_cols = ['name', 'category', 'price', 'views', 'favorites', 'performance_score']
-    table_df = filtered_df[display_cols].copy()
-    table_df['performance_score'] = table_df['performance_score'].round(1)
+    order = np.argsort(-score, kind='stable')
+    table_df = filtered_df[display_cols].iloc[order].round({'performance_score': 1})
     
     st.dataframe(
-        table_df.sort_values('performance_score', ascending=False),
+        table_df,
         column_config={
             "name": "Product Name",
             "category": "Category",
@@ -263,9 +310,9 @@ if not filtered_df.empty:
         if st.button("📊 Export Analytics Report"):
             report_data = {
                 'summary': {
-                    'total_products': total_products,
-                    'total_views': total_views,
-                    'total_favorites': total_favorites,
+                    'total_products': len(filtered_df),
+                    'total_views': stats['views_sum'],
+                    'total_favorites': stats['favorites_sum'],
                     'avg_performance': avg_performance
                 },
                 'top_products': top_products.to_dict('records'),
@@ -296,6 +343,9 @@ if not filtered_df.empty:
         if st.button("🔄 Refresh Data"):
             st.rerun()
 
+if not filtered_df.empty:
+    with st.expander("📊 Detailed Analytics", expanded=True):
+        render_detailed_analytics(filtered_df, stats)
 else:
     st.warning("No products match the selected filters.")
 
@@ -309,15 +359,31 @@ ai_analytics_tab1, ai_analytics_tab2, ai_analytics_tab3, ai_analytics_tab4 = st.
     "🎯 SDG Impact", "🌱 Sustainability", "🏛️ Cultural Preservation", "📈 Business Intelligence"
 ])
 
-# Initialize AI assistant
-@st.cache_resource
-def get_ai_assistant():
-    try:
-        return AIAssistant()
-    except:
-        return None
+# Initialize AI assistant, shared across sessions and pages
+ai_assistant = get_shared_ai_assistant()
 
-ai_assistant = get_ai_assistant()
+@st.cache_data(ttl=1800, show_spinner=False)
+def get_sdg_report(n_products, categories, n_profiles):
+    """SDG assessment for the current filter state, cached so repeat clicks skip the AI call"""
+    business_data = {
+        'business_type': f"Artisan marketplace with {n_products} products",
+        'products': f"Handmade items in categories: {', '.join(categories)}",
+        'materials': 'Traditional and sustainable materials',
+        'community': 'Global artisan community',
+        'employment': f'Supporting {n_profiles} artisan entrepreneurs',
+        'sustainability': 'Handmade production, cultural preservation'
+    }
+    return get_shared_ai_assistant().sdg_impact_assessment(business_data)
+
+def get_business_recommendations(n_products, avg_price):
+    """Business growth guidance for the current filter state; failures fall back to the assistant's message uncached"""
+    return cached_ai_text(
+        ai_assistant,
+        "financial_literacy_guidance",
+        "business growth strategy",
+        "intermediate",
+        f"Artisan with {n_products} products, average price ${avg_price:.2f}"
+    )
 
 with ai_analytics_tab1:
     st.markdown("### 🎯 Sustainable Development Goals (SDG) Impact Dashboard")
@@ -327,34 +393,24 @@ with ai_analytics_tab1:
         col1, col2 = st.columns(2)
         
         with col1:
-            # Sample SDG data (in real implementation, this would come from actual assessments)
-            sdg_data = {
-                'SDG 1': {'name': 'No Poverty', 'score': 75, 'contribution': 'Providing fair income to artisans'},
-                'SDG 5': {'name': 'Gender Equality', 'score': 85, 'contribution': 'Supporting women artisans'},
-                'SDG 8': {'name': 'Decent Work', 'score': 90, 'contribution': 'Creating quality employment'},
-                'SDG 10': {'name': 'Reduced Inequalities', 'score': 80, 'contribution': 'Fair trade practices'},
-                'SDG 11': {'name': 'Sustainable Cities', 'score': 70, 'contribution': 'Supporting local communities'},
-                'SDG 12': {'name': 'Responsible Consumption', 'score': 95, 'contribution': 'Handmade, sustainable products'}
-            }
-            
             # SDG Impact Metrics
-            avg_sdg_score = sum([sdg['score'] for sdg in sdg_data.values()]) / len(sdg_data)
+            avg_sdg_score = float(SDG_SCORES.mean())
             st.metric("🌍 Overall SDG Impact Score", f"{avg_sdg_score:.1f}/100")
             
             # Top contributing SDGs
-            sorted_sdgs = sorted(sdg_data.items(), key=lambda x: x[1]['score'], reverse=True)
+            top_sdgs = SDG_KEYS[np.argsort(-SDG_SCORES, kind='stable')[:3]]
             st.markdown("**🏆 Top SDG Contributions:**")
-            for i, (sdg, data) in enumerate(sorted_sdgs[:3]):
+            for i, sdg in enumerate(top_sdgs):
+                data = SDG_DATA[sdg]
                 st.write(f"{i+1}. **{sdg}**: {data['name']} ({data['score']}/100)")
                 st.caption(f"💡 {data['contribution']}")
         
         with col2:
             # SDG Impact Chart
-            sdg_names = [f"{k}: {v['name']}" for k, v in sdg_data.items()]
-            sdg_scores = [v['score'] for v in sdg_data.values()]
+            sdg_names = [f"{k}: {v['name']}" for k, v in SDG_DATA.items()]
             
             fig_sdg = go.Figure(data=go.Bar(
-                x=sdg_scores,
+                x=SDG_SCORES,
                 y=sdg_names,
                 orientation='h',
                 marker_color='lightblue'
@@ -368,12 +424,7 @@ with ai_analytics_tab1:
         
         # SDG Progress Over Time (simulated data)
         st.markdown("#### 📈 SDG Impact Progress")
-        dates = pd.date_range(start='2024-01-01', end=datetime.now(), freq='M')
-        progress_data = {
-            'Date': dates,
-            'Overall SDG Score': [avg_sdg_score - 20 + (i * 3) for i in range(len(dates))]
-        }
-        progress_df = pd.DataFrame(progress_data)
+        progress_df = get_sdg_progress(datetime.now().strftime('%Y-%m'), avg_sdg_score)
         
         fig_progress = px.line(progress_df, x='Date', y='Overall SDG Score', 
                               title="SDG Impact Score Over Time")
@@ -383,16 +434,11 @@ with ai_analytics_tab1:
         if ai_assistant and st.button("🤖 Generate Detailed SDG Report", use_container_width=True):
             with st.spinner("Analyzing SDG impact..."):
                 # Sample business data based on products
-                business_data = {
-                    'business_type': f"Artisan marketplace with {len(filtered_df)} products",
-                    'products': f"Handmade items in categories: {', '.join(filtered_df['category'].unique())}",
-                    'materials': 'Traditional and sustainable materials',
-                    'community': 'Global artisan community',
-                    'employment': f'Supporting {len(profiles_df)} artisan entrepreneurs',
-                    'sustainability': 'Handmade production, cultural preservation'
-                }
-                
-                sdg_assessment = ai_assistant.sdg_impact_assessment(business_data)
+                sdg_assessment = get_sdg_report(
+                    len(filtered_df),
+                    unique_categories,
+                    len(profiles_df)
+                )
                 
                 if sdg_assessment.get('sdg_contributions'):
                     st.success("🎯 **Detailed SDG Impact Analysis:**")
@@ -435,10 +481,10 @@ with ai_analytics_tab2:
             }
             
             st.markdown("**📊 Sustainability by Category:**")
+            category_counts = filtered_df['category'].value_counts()
             for category, score in category_sustainability.items():
-                if category in filtered_df['category'].values:
-                    count = len(filtered_df[filtered_df['category'] == category])
-                    st.write(f"🎯 {category}: {score}/100 ({count} products)")
+                if category in category_set:
+                    st.write(f"🎯 {category}: {score}/100 ({int(category_counts[category])} products)")
         
         with col2:
             # Environmental Impact Chart
@@ -494,8 +540,10 @@ with ai_analytics_tab3:
             # Cultural Diversity Index
             st.markdown("**🌍 Cultural Diversity Represented:**")
             cultural_regions = ['East Asian', 'European', 'African', 'Latin American', 'Middle Eastern']
-            for region in cultural_regions:
-                representation = np.random.randint(10, 30)  # Simulated data
+            # Simulated data - seeded so values stay stable across reruns
+            rng = np.random.default_rng(0)
+            representations = rng.integers(10, 30, size=len(cultural_regions))
+            for region, representation in zip(cultural_regions, representations):
                 st.write(f"🌏 {region}: {representation}% of products")
         
         with col2:
@@ -530,9 +578,9 @@ with ai_analytics_tab4:
         
         with col1:
             # Business Health Score
-            total_revenue = filtered_df['price'].sum()
-            avg_price = filtered_df['price'].mean()
-            price_variance = filtered_df['price'].std()
+            total_revenue = stats['price_sum']
+            avg_price = stats['price_mean']
+            price_variance = stats['price_std']
             
             # Calculate business health score
             health_score = min(100, (total_revenue / 100) + (avg_price / 2) + (50 if price_variance < avg_price else 30))
@@ -569,13 +617,9 @@ with ai_analytics_tab4:
             st.plotly_chart(fig_prediction, use_container_width=True)
         
         # AI Business Recommendations
-        if st.button("🤖 Generate Business Recommendations", use_container_width=True):
+        if ai_assistant and st.button("🤖 Generate Business Recommendations", use_container_width=True):
             with st.spinner("Analyzing your business and generating recommendations..."):
-                financial_guidance = ai_assistant.financial_literacy_guidance(
-                    "business growth strategy",
-                    "intermediate",
-                    f"Artisan with {len(filtered_df)} products, average price ${avg_price:.2f}"
-                )
+                financial_guidance = get_business_recommendations(len(filtered_df), round(float(avg_price), 2))
                 
                 st.success("**🎯 AI Business Recommendations:**")
                 st.write(financial_guidance)
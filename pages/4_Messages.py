@@ -1,9 +1,11 @@
+import html
 import streamlit as st
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
 from datetime import datetime
+from pathlib import Path
 from utils.database_factory import create_database_service
-from utils.ai_assistant import AIAssistant
-from utils.ai_ui_components import AIUIComponents
+from utils.ai_ui_components import AIUIComponents, get_shared_ai_assistant
 
 st.set_page_config(
     page_title="Messages - TrueCraft",
@@ -18,71 +20,119 @@ def get_database_service():
 
 db_manager = get_database_service()
 
+@st.cache_resource
+def get_io_executor():
+    """Worker threads for independent database reads within one run"""
+    return ThreadPoolExecutor(max_workers=4)
+
+CONVERSATIONS_PER_PAGE = 20
+THREAD_PAGE_SIZE = 50
+
+# Cached reads; Streamlit reruns the script on every keystroke, so these keep
+# typing in the forms from hitting the database each time. Keys include the
+# user and filters, so entries are capped to bound memory across sessions.
+@st.cache_data(ttl=30, show_spinner=False, max_entries=256)
+def load_conversations(email=None, sender_type=None, unread_only=False, product_id=None,
+                       order_by='recent', limit=None, offset=0):
+    conversations = db_manager.get_conversations(email=email, sender_type=sender_type,
+                                                 unread_only=unread_only, product_id=product_id,
+                                                 order_by=order_by, limit=limit, offset=offset)
+    # Shorten subjects for the list once per fetch rather than on every rerun
+    for conversation in conversations:
+        subject = conversation['first_subject']
+        conversation['subject_short'] = subject if len(subject) <= 50 else subject[:50] + "..."
+    return conversations
+
+@st.cache_data(ttl=30, show_spinner=False, max_entries=256)
+def load_conversation_summary(email=None, sender_type=None, unread_only=False, product_id=None):
+    return db_manager.get_conversation_summary(email=email, sender_type=sender_type,
+                                               unread_only=unread_only, product_id=product_id)
+
+@st.cache_data(ttl=30, show_spinner=False, max_entries=256)
+def load_sidebar_stats(email):
+    return db_manager.get_sidebar_stats(email)
+
+# The catalog changes rarely; the sidebar Refresh button clears these too
+PRODUCT_CHOICES_LIMIT = 500
+
+@st.cache_data(ttl=300, show_spinner=False)
+def load_product_choices(limit=None):
+    return db_manager.get_product_choices(limit=limit)
+
+@st.cache_data(ttl=300, show_spinner=False)
+def load_product_options():
+    """Selectbox labels and matching product ids, with "General Inquiry" first"""
+    products = load_product_choices(PRODUCT_CHOICES_LIMIT)
+    labels = tuple(f"{p['name']} (${p['price']:.2f})" for p in products)
+    return ("General Inquiry", *labels), (None, *(p['id'] for p in products))
+
+@st.cache_data(ttl=300, show_spinner=False)
+def load_product_filter_options():
+    """Names and ids for the By Product filter, with "All Products" (None) first"""
+    products = load_product_choices()
+    return ("All Products", *(p['name'] for p in products)), (None, *(p['id'] for p in products))
+
+def clear_message_cache():
+    """Drop cached conversation data after a write so the next run sees it"""
+    load_conversations.clear()
+    load_conversation_summary.clear()
+    load_sidebar_stats.clear()
+
 # Initialize AI components safely
 def get_ai_assistant():
-    """Get AI assistant with error handling"""
-    try:
-        if 'ai_assistant' not in st.session_state:
-            st.session_state.ai_assistant = AIAssistant()
-        return st.session_state.ai_assistant
-    except Exception as e:
+    """Get the AI assistant shared across sessions and pages"""
+    ai_assistant = get_shared_ai_assistant()
+    if ai_assistant is None:
         st.warning("AI features are currently unavailable. Some functionality may be limited.")
-        return None
+    return ai_assistant
 
-ai_ui = AIUIComponents()
+@st.cache_resource
+def get_ai_ui():
+    return AIUIComponents()
 
-# Custom CSS for messaging interface
-st.markdown("""
-<style>
-    .conversation-card {
-        background: #f8f9fa;
-        padding: 1rem;
-        border-radius: 8px;
-        margin-bottom: 0.5rem;
-        border-left: 4px solid #007BFF;
-        cursor: pointer;
-    }
-    .conversation-card:hover {
-        background: #e9ecef;
-    }
-    .unread-badge {
-        background: #dc3545;
-        color: white;
-        padding: 0.25rem 0.5rem;
-        border-radius: 12px;
-        font-size: 0.75rem;
-        font-weight: bold;
-    }
-    .message-bubble-sender {
-        background: #007BFF;
-        color: white;
-        padding: 0.75rem;
-        border-radius: 12px 12px 4px 12px;
-        margin: 0.5rem 0;
-        margin-left: 20%;
-    }
-    .message-bubble-receiver {
-        background: #f8f9fa;
-        color: #333;
-        padding: 0.75rem;
-        border-radius: 12px 12px 12px 4px;
-        margin: 0.5rem 0;
-        margin-right: 20%;
-        border: 1px solid #dee2e6;
-    }
-    .message-meta {
-        font-size: 0.75rem;
-        color: #6c757d;
-        margin-top: 0.25rem;
-    }
-    .contact-form-container {
-        background: #f8f9fa;
-        padding: 1.5rem;
-        border-radius: 8px;
-        border: 1px solid #dee2e6;
-    }
-</style>
-""", unsafe_allow_html=True)
+ai_ui = get_ai_ui()
+
+# Button callbacks run before the next script run, so the page redraws once
+# with the new state instead of drawing twice around an explicit st.rerun()
+def show_view(view):
+    st.session_state.current_conversation = view
+
+def load_more_conversations():
+    st.session_state.msg_page += 1
+
+def thread_limit(conversation):
+    """Number of recent messages to show for a conversation"""
+    key = (conversation['product_id'], conversation['sender_email'])
+    return st.session_state.setdefault('thread_limits', {}).get(key, THREAD_PAGE_SIZE)
+
+def load_older_messages(conversation):
+    key = (conversation['product_id'], conversation['sender_email'])
+    st.session_state.thread_limits[key] = thread_limit(conversation) + THREAD_PAGE_SIZE
+
+def mark_conversation_read(conversation):
+    db_manager.mark_conversation_as_read(conversation['product_id'], conversation['sender_email'])
+    clear_message_cache()
+    conversation['unread_count'] = 0
+    st.toast("Marked as read!")
+
+def message_bubble_html(message, is_sender, sent_at):
+    """Chat bubble markup for one message, right-aligned when sent by the current user"""
+    content = html.escape(message['message_content'])
+    if is_sender:
+        meta = f"You • {sent_at}{' • Read' if message['is_read'] else ' • Unread'}"
+        css_class = "message-bubble-sender"
+    else:
+        meta = f"{html.escape(message['sender_name'])} • {sent_at}"
+        css_class = "message-bubble-receiver"
+    return f'<div class="{css_class}"><div>{content}</div><div class="message-meta">{meta}</div></div>'
+
+# Custom CSS for messaging interface, read from disk once per process
+@st.cache_data
+def load_css(filename):
+    css_path = Path(__file__).resolve().parent.parent / "static" / filename
+    return f"<style>{css_path.read_text()}</style>"
+
+st.markdown(load_css("messages.css"), unsafe_allow_html=True)
 
 st.title("💬 Messages")
 st.markdown("Manage your buyer-seller communications")
@@ -97,6 +147,18 @@ if 'user_name' not in st.session_state:
 if 'user_type' not in st.session_state:
     st.session_state.user_type = "seller"  # Default to seller view
 
+# Start loading an open thread now so it overlaps with the sidebar queries.
+# One extra message is requested to tell whether older ones exist.
+thread_prefetch = None
+if isinstance(st.session_state.current_conversation, dict):
+    open_conversation = st.session_state.current_conversation
+    prefetch_emails = [open_conversation['sender_email'], st.session_state.user_email]
+    thread_prefetch = (
+        prefetch_emails,
+        get_io_executor().submit(db_manager.get_message_thread, open_conversation['product_id'],
+                                 prefetch_emails, thread_limit(open_conversation) + 1)
+    )
+
 # Sidebar for user profile and navigation
 with st.sidebar:
     st.subheader("👤 Your Profile")
@@ -106,14 +168,15 @@ with st.sidebar:
                             index=0 if st.session_state.user_type == "seller" else 1)
     st.session_state.user_type = user_type
     
-    # User information
-    user_email = st.text_input("Your Email", value=st.session_state.user_email)
-    user_name = st.text_input("Your Name", value=st.session_state.user_name)
-    
-    if st.button("Update Profile", use_container_width=True):
-        st.session_state.user_email = user_email
-        st.session_state.user_name = user_name
-        st.success("Profile updated!")
+    # User information; a form so editing the fields doesn't rerun the page
+    with st.form("profile_form", border=False):
+        user_email = st.text_input("Your Email", value=st.session_state.user_email)
+        user_name = st.text_input("Your Name", value=st.session_state.user_name)
+        
+        if st.form_submit_button("Update Profile", use_container_width=True):
+            st.session_state.user_email = user_email
+            st.session_state.user_name = user_name
+            st.success("Profile updated!")
     
     st.divider()
     
@@ -123,15 +186,204 @@ with st.sidebar:
         st.session_state.current_conversation = "new"
     
     if st.button("🔄 Refresh", use_container_width=True):
-        st.rerun()
+        # The stats and lists below are read after this point, so no extra rerun is needed
+        clear_message_cache()
+        load_product_choices.clear()
+        load_product_options.clear()
+        load_product_filter_options.clear()
     
     # Stats
     st.divider()
     st.subheader("📊 Message Stats")
-    unread_count = db_manager.get_unread_message_count(st.session_state.user_email)
-    conversations = db_manager.get_conversations()
-    st.metric("Unread Messages", unread_count)
-    st.metric("Total Conversations", len(conversations))
+    sidebar_stats = load_sidebar_stats(st.session_state.user_email)
+    st.metric("Unread Messages", sidebar_stats['unread_count'])
+    st.metric("Total Conversations", sidebar_stats['conversation_count'])
+
+# Sections that rerun independently of the rest of the page
+@st.fragment
+def render_reply_section(conversation):
+    """AI reply assistant and reply form; reruns on its own while drafting"""
+    # AI Reply Assistant (outside form)
+    with st.expander("🤖 AI Reply Assistant", expanded=False):
+        col1, col2 = st.columns(2)
+        with col1:
+            ai_ui.message_templates_widget(
+                message_type="follow_up",
+                product_name=conversation.get('product_name', 'General')
+            )
+        
+        with col2:
+            if st.button("✨ Generate Professional Reply", key="gen_reply_btn"):
+                ai_assistant = get_ai_assistant()
+                if ai_assistant:
+                    try:
+                        reply_context = f"Reply to {conversation['sender_name']} about {conversation.get('product_name', 'inquiry')}"
+                        # Show the reply as it is generated rather than after the full response
+                        generated_reply = st.write_stream(ai_assistant.stream_custom_content(
+                            "professional reply message",
+                            reply_context,
+                            f"Courteous {st.session_state.user_type} response"
+                        ))
+                        st.session_state['generated_reply'] = generated_reply.strip()
+                        st.success("Reply generated!")
+                    except:
+                        st.error("AI unavailable")
+                else:
+                    st.error("AI features are currently unavailable.")
+            
+            if 'generated_reply' in st.session_state:
+                st.text_area("Generated Reply:", st.session_state['generated_reply'], height=80, key="gen_reply_display")
+    
+    # Reply form
+    with st.form("reply_form"):
+        reply_message = st.text_area("Your Reply", 
+                                   value=st.session_state.get('reply_text', ''),
+                                   placeholder="Type your reply here...", 
+                                   height=100,
+                                   key="reply_input")
+        st.session_state['reply_text'] = reply_message
+        
+        col1, col2 = st.columns([3, 1])
+        with col2:
+            if st.form_submit_button("📤 Send Reply", use_container_width=True):
+                if reply_message:
+                    reply_data = {
+                        'sender_type': st.session_state.user_type,
+                        'sender_name': st.session_state.user_name,
+                        'sender_email': st.session_state.user_email,
+                        'product_id': conversation['product_id'],
+                        'subject': f"Re: {conversation.get('first_subject') or 'Conversation'}",
+                        'message_content': reply_message
+                    }
+                    
+                    # Replying also marks the thread read, committed together with the reply
+                    message_id = db_manager.send_messages(
+                        [reply_data],
+                        mark_read={'product_id': conversation['product_id'], 'sender_email': conversation['sender_email']}
+                    )
+                    if message_id:
+                        clear_message_cache()
+                        st.success("Reply sent! 🎉")
+                        st.rerun()
+                    else:
+                        st.error("Failed to send reply. Please try again.")
+                else:
+                    st.error("Please enter a message.")
+
+@st.fragment
+def render_conversation_list():
+    """Filters and the paged conversation list; filter changes rerun only this section"""
+    # Main conversations view
+    st.subheader("📋 Your Conversations")
+    
+    # Filter options
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        show_filter = st.selectbox("Show", ["All Messages", "Unread Only", "By Product"])
+    with col2:
+        product_filter = None  # All products
+        if show_filter == "By Product":
+            product_names, product_ids = load_product_filter_options()
+            if len(product_ids) > 1:
+                product_filter = st.selectbox("Select Product", product_ids,
+                                              format_func=dict(zip(product_ids, product_names)).get)
+    with col3:
+        sort_by = st.selectbox("Sort by", ["Recent First", "Oldest First", "Most Messages"])
+    
+    sort_options = {"Recent First": "recent", "Oldest First": "oldest", "Most Messages": "most_messages"}
+    
+    # Show conversations in pages of CONVERSATIONS_PER_PAGE, starting over when the filters change
+    list_view = (st.session_state.user_type, show_filter, product_filter, sort_by)
+    if st.session_state.get('msg_list_view') != list_view:
+        st.session_state.msg_list_view = list_view
+        st.session_state.msg_page = 1
+    
+    # Seller sees messages from buyers, buyer sees their own messages;
+    # filtering, sorting and paging all happen in the database
+    conversation_filters = {
+        'email': st.session_state.user_email if st.session_state.user_type != "seller" else None,
+        'sender_type': 'buyer' if st.session_state.user_type == "seller" else None,
+        'unread_only': show_filter == "Unread Only",
+        'product_id': product_filter
+    }
+    filtered_conversations = load_conversations(
+        **conversation_filters,
+        order_by=sort_options[sort_by],
+        limit=CONVERSATIONS_PER_PAGE * st.session_state.msg_page
+    )
+    summary = load_conversation_summary(**conversation_filters)
+    
+    # Display conversations
+    if filtered_conversations:
+        # One table element for the whole page of conversations; selecting a row opens it.
+        # Reruns that fetch the same rows (e.g. row selection) reuse the table built last time.
+        table_sig = hash(tuple(
+            (c['product_id'], c['product_name'], c['sender_email'], c['sender_name'],
+             c['subject_short'], c['message_count'], c['unread_count'], c['last_message_time'])
+            for c in filtered_conversations
+        ))
+        if st.session_state.get('_conv_sig') != table_sig:
+            st.session_state._conv_table = pd.DataFrame.from_records(
+                filtered_conversations,
+                columns=['product_name', 'sender_name', 'sender_email', 'subject_short',
+                         'message_count', 'unread_count', 'last_message_time']
+            ).rename(columns={
+                'product_name': 'Product', 'sender_name': 'With', 'sender_email': 'Email',
+                'subject_short': 'Subject', 'message_count': 'Messages', 'unread_count': 'Unread',
+                'last_message_time': 'Last Message'
+            })
+            st.session_state._conv_sig = table_sig
+        table_df = st.session_state._conv_table
+        
+        event = st.dataframe(
+            table_df,
+            hide_index=True,
+            use_container_width=True,
+            on_select="rerun",
+            selection_mode="single-row",
+            key="conversation_table",
+            column_config={
+                'Messages': st.column_config.NumberColumn("💬 Messages"),
+                'Unread': st.column_config.NumberColumn("📬 Unread"),
+                'Last Message': st.column_config.DatetimeColumn("🕒 Last Message", format="MMM DD, YYYY")
+            }
+        )
+        st.caption(f"Showing {len(filtered_conversations)} of {summary['conversation_count']} conversations. "
+                   "Select one to open it.")
+        
+        if len(filtered_conversations) < summary['conversation_count']:
+            st.button("Load more", key="load_more_conversations", on_click=load_more_conversations)
+        
+        if event.selection.rows:
+            st.session_state.current_conversation = filtered_conversations[event.selection.rows[0]]
+            st.rerun()
+        
+        # Summary stats across all pages, aggregated in SQL
+        st.subheader("📊 Conversation Summary")
+        
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Conversations", summary['conversation_count'])
+        with col2:
+            st.metric("Unread Messages", summary['unread_count'])
+        with col3:
+            st.metric("Total Messages", summary['message_count'])
+            
+    else:
+        if show_filter == "Unread Only":
+            st.info("📬 No unread messages. Great job staying on top of your communications!")
+        else:
+            st.info("💬 No conversations yet. Start by browsing products and contacting sellers, or wait for buyers to reach out!")
+        
+        # Quick action buttons
+        col1, col2 = st.columns(2)
+        with col1:
+            if st.button("📝 Send New Message", use_container_width=True):
+                st.session_state.current_conversation = "new"
+                st.rerun()
+        with col2:
+            if st.button("🛍️ Browse Products", use_container_width=True):
+                st.switch_page("pages/1_Product_Listings.py")
 
 # Main content area
 if st.session_state.current_conversation == "new":
@@ -147,16 +399,13 @@ if st.session_state.current_conversation == "new":
     with st.container():
         st.markdown('<div class="contact-form-container">', unsafe_allow_html=True)
         
-        # Get products for selection
-        products_df = db_manager.get_products()
-        
-        # Initialize variables with default values
-        if not products_df.empty:
-            product_options = ["General Inquiry"] + [f"{row['name']} (${row['price']:.2f})" for _, row in products_df.iterrows()]
-            selected_product_idx = 0  # Default to General Inquiry
+        # Most messages are general inquiries, so only fetch products when one is attached
+        attach_product = st.checkbox("Attach a product?", key="attach_product")
+        if attach_product:
+            product_options, product_ids = load_product_options()
         else:
-            product_options = ["General Inquiry"]
-            selected_product_idx = 0
+            product_options, product_ids = ("General Inquiry",), (None,)
+        selected_product_idx = 0  # Default to General Inquiry
         
         # Initialize form variables in session state
         recipient_name = st.session_state.get('recipient_name', '')
@@ -169,7 +418,7 @@ if st.session_state.current_conversation == "new":
             with template_col1:
                 ai_ui.message_templates_widget(
                     message_type="inquiry",
-                    product_name=product_options[selected_product_idx] if selected_product_idx < len(product_options) else None
+                    product_name=product_options[selected_product_idx]
                 )
             
             with template_col2:
@@ -180,12 +429,17 @@ if st.session_state.current_conversation == "new":
                         if ai_assistant:
                             try:
                                 with st.spinner("Creating message..."):
-                                    custom_msg = ai_assistant.generate_custom_content(
-                                        "business message",
-                                        f"Message from {st.session_state.user_type} to {recipient_name} about {subject}",
-                                        f"Professional {st.session_state.user_type} inquiry"
+                                    # Draft the body and review the subject in one round trip
+                                    custom_msg, subject_tips = ai_assistant.run_concurrently(
+                                        lambda: ai_assistant.generate_custom_content(
+                                            "business message",
+                                            f"Message from {st.session_state.user_type} to {recipient_name} about {subject}",
+                                            f"Professional {st.session_state.user_type} inquiry"
+                                        ),
+                                        lambda: ai_assistant.quick_improve_suggestions(subject, "message subject")
                                     )
                                     st.session_state['generated_message'] = custom_msg
+                                    st.session_state['subject_tips'] = subject_tips
                                     st.success("Message generated!")
                             except:
                                 st.error("AI unavailable")
@@ -196,22 +450,22 @@ if st.session_state.current_conversation == "new":
                 
                 if 'generated_message' in st.session_state:
                     st.text_area("Generated Message:", st.session_state['generated_message'], height=80, key="gen_msg_display")
+                if 'subject_tips' in st.session_state:
+                    st.markdown("**Subject Tips:**")
+                    st.markdown(st.session_state['subject_tips'])
         
         with st.form("new_message_form"):
             col1, col2 = st.columns(2)
             
             with col1:
-                if not products_df.empty:
-                    product_options = ["General Inquiry"] + [f"{row['name']} (${row['price']:.2f})" for _, row in products_df.iterrows()]
-                    product_ids = [None] + products_df['id'].tolist()
-                    
+                if len(product_options) > 1:
                     selected_product_idx = st.selectbox("About Product", range(len(product_options)), 
                                                        format_func=lambda x: product_options[x])
                     selected_product_id = product_ids[selected_product_idx]
                 else:
-                    st.info("No products available")
+                    if attach_product:
+                        st.info("No products available")
                     selected_product_id = None
-                    product_options = ["General Inquiry"]
                     selected_product_idx = 0
                 
                 recipient_type = "seller" if st.session_state.user_type == "buyer" else "buyer"
@@ -230,12 +484,7 @@ if st.session_state.current_conversation == "new":
                                       key="subject_input")
                 st.session_state['message_subject'] = subject
                 
-                # AI suggestions for subjects
-                if subject and len(subject) > 5:
-                    ai_ui.ai_suggestions_panel(subject, "message")
-                
                 # AI-Enhanced Message Content
-                product_name = product_options[selected_product_idx] if selected_product_idx < len(product_options) else None
                 message_content = st.text_area(
                     "Message*", 
                     value=st.session_state.get('message_content', ''),
@@ -258,6 +507,7 @@ if st.session_state.current_conversation == "new":
                     
                     message_id = db_manager.send_message(message_data)
                     if message_id:
+                        clear_message_cache()
                         st.success("Message sent successfully! 🎉")
                         st.session_state.current_conversation = None
                         st.rerun()
@@ -267,251 +517,75 @@ if st.session_state.current_conversation == "new":
                     st.error("Please fill in all required fields.")
         
         st.markdown('</div>', unsafe_allow_html=True)
+        
+        # AI suggestions for the last submitted subject; buttons can't live inside st.form
+        subject = st.session_state.get('message_subject', '')
+        if subject and len(subject) > 5:
+            ai_ui.ai_suggestions_panel(subject, "message")
     
-    if st.button("← Back to Conversations"):
-        st.session_state.current_conversation = None
-        st.rerun()
+    st.button("← Back to Conversations", on_click=show_view, args=(None,))
 
 elif st.session_state.current_conversation:
     # Show specific conversation
     conversation = st.session_state.current_conversation
+    my_email = st.session_state.user_email
+    product_name = conversation.get('product_name')
     
-    st.subheader(f"💬 Conversation: {conversation.get('product_name', 'General')}")
+    st.subheader(f"💬 Conversation: {product_name or 'General'}")
     
     # Conversation header
     col1, col2, col3 = st.columns([2, 1, 1])
     with col1:
         st.write(f"**Participant:** {conversation['sender_name']} ({conversation['sender_email']})")
-        st.write(f"**Product:** {conversation.get('product_name', 'General Inquiry')}")
+        st.write(f"**Product:** {product_name or 'General Inquiry'}")
     with col2:
         st.write(f"**Messages:** {conversation['message_count']}")
         if conversation['unread_count'] > 0:
             st.markdown(f'<span class="unread-badge">{conversation["unread_count"]} unread</span>', 
                        unsafe_allow_html=True)
     with col3:
-        if st.button("Mark as Read"):
-            db_manager.mark_conversation_as_read(conversation['product_id'], conversation['sender_email'])
-            st.success("Marked as read!")
-            st.rerun()
+        st.button("Mark as Read", on_click=mark_conversation_read, args=(conversation,))
     
     st.divider()
     
     # Load message thread
-    participant_emails = [conversation['sender_email'], st.session_state.user_email]
-    messages = db_manager.get_message_thread(conversation['product_id'], participant_emails)
+    participant_emails = [conversation['sender_email'], my_email]
+    limit = thread_limit(conversation)
+    if thread_prefetch and thread_prefetch[0] == participant_emails:
+        messages = thread_prefetch[1].result()
+    else:
+        messages = db_manager.get_message_thread(conversation['product_id'], participant_emails, limit + 1)
+    has_older = len(messages) > limit
+    if has_older:
+        messages = messages[1:]
     
     # Display messages
     if messages:
         st.subheader("Message History")
         
-        for message in messages:
-            is_sender = message['sender_email'] == st.session_state.user_email
-            
-            if is_sender:
-                # Message from current user (right aligned)
-                st.markdown(f"""
-                <div class="message-bubble-sender">
-                    <div>{message['message_content']}</div>
-                    <div class="message-meta">
-                        You • {message['timestamp'].strftime('%b %d, %Y at %I:%M %p')}
-                        {' • Read' if message['is_read'] else ' • Unread'}
-                    </div>
-                </div>
-                """, unsafe_allow_html=True)
-            else:
-                # Message from other user (left aligned)
-                st.markdown(f"""
-                <div class="message-bubble-receiver">
-                    <div>{message['message_content']}</div>
-                    <div class="message-meta">
-                        {message['sender_name']} • {message['timestamp'].strftime('%b %d, %Y at %I:%M %p')}
-                    </div>
-                </div>
-                """, unsafe_allow_html=True)
+        if has_older:
+            st.button("⬆ Load older messages", on_click=load_older_messages, args=(conversation,))
+        
+        # Render the whole thread as one element instead of one per message,
+        # formatting every timestamp in a single pandas call
+        sent_times = pd.to_datetime([message['timestamp'] for message in messages]).strftime('%b %d, %Y at %I:%M %p')
+        thread_html = "".join(
+            message_bubble_html(message, message['sender_email'] == my_email, sent_at)
+            for message, sent_at in zip(messages, sent_times)
+        )
+        st.markdown(thread_html, unsafe_allow_html=True)
     else:
         st.info("No messages in this conversation yet.")
     
     # AI-Enhanced Reply Section
     st.divider()
     st.subheader("📝 Reply")
+    render_reply_section(conversation)
     
-    # AI Reply Assistant (outside form)
-    with st.expander("🤖 AI Reply Assistant", expanded=False):
-        col1, col2 = st.columns(2)
-        with col1:
-            ai_ui.message_templates_widget(
-                message_type="follow_up",
-                product_name=conversation.get('product_name', 'General')
-            )
-        
-        with col2:
-            if st.button("✨ Generate Professional Reply", key="gen_reply_btn"):
-                ai_assistant = get_ai_assistant()
-                if ai_assistant:
-                    try:
-                        with st.spinner("Generating reply..."):
-                            reply_context = f"Reply to {conversation['sender_name']} about {conversation.get('product_name', 'inquiry')}"
-                            generated_reply = ai_assistant.generate_custom_content(
-                                "professional reply message",
-                                reply_context,
-                                f"Courteous {st.session_state.user_type} response"
-                            )
-                            st.session_state['generated_reply'] = generated_reply
-                            st.success("Reply generated!")
-                            st.rerun()
-                    except:
-                        st.error("AI unavailable")
-                else:
-                    st.error("AI features are currently unavailable.")
-            
-            if 'generated_reply' in st.session_state:
-                st.text_area("Generated Reply:", st.session_state['generated_reply'], height=80, key="gen_reply_display")
-    
-    # Reply form
-    with st.form("reply_form"):
-        reply_message = st.text_area("Your Reply", 
-                                   value=st.session_state.get('reply_text', ''),
-                                   placeholder="Type your reply here...", 
-                                   height=100,
-                                   key="reply_input")
-        st.session_state['reply_text'] = reply_message
-        
-        col1, col2 = st.columns([3, 1])
-        with col2:
-            if st.form_submit_button("📤 Send Reply", use_container_width=True):
-                if reply_message:
-                    reply_data = {
-                        'sender_type': st.session_state.user_type,
-                        'sender_name': st.session_state.user_name,
-                        'sender_email': st.session_state.user_email,
-                        'product_id': conversation['product_id'],
-                        'subject': f"Re: {conversation.get('subjects', 'Conversation')}",
-                        'message_content': reply_message
-                    }
-                    
-                    message_id = db_manager.send_message(reply_data)
-                    if message_id:
-                        st.success("Reply sent! 🎉")
-                        st.rerun()
-                    else:
-                        st.error("Failed to send reply. Please try again.")
-                else:
-                    st.error("Please enter a message.")
-    
-    if st.button("← Back to Conversations"):
-        st.session_state.current_conversation = None
-        st.rerun()
+    st.button("← Back to Conversations", on_click=show_view, args=(None,))
 
 else:
-    # Main conversations view
-    st.subheader("📋 Your Conversations")
-    
-    # Filter options
-    col1, col2, col3 = st.columns(3)
-    with col1:
-        show_filter = st.selectbox("Show", ["All Messages", "Unread Only", "By Product"])
-    with col2:
-        product_filter = "All Products"  # Default value
-        if show_filter == "By Product":
-            products_df = db_manager.get_products()
-            if not products_df.empty:
-                product_filter = st.selectbox("Select Product", 
-                                             ["All Products"] + products_df['name'].tolist())
-            else:
-                product_filter = "All Products"
-    with col3:
-        sort_by = st.selectbox("Sort by", ["Recent First", "Oldest First", "Most Messages"])
-    
-    # Get conversations based on user type and email
-    if st.session_state.user_type == "seller":
-        # Seller sees messages from buyers
-        conversations = db_manager.get_conversations(sender_type='buyer')
-    else:
-        # Buyer sees their own messages
-        conversations = db_manager.get_conversations(email=st.session_state.user_email)
-    
-    # Apply filters
-    filtered_conversations = conversations.copy()
-    
-    if show_filter == "Unread Only":
-        filtered_conversations = [conv for conv in filtered_conversations if conv['unread_count'] > 0]
-    elif show_filter == "By Product" and 'product_filter' in locals() and product_filter != "All Products":
-        filtered_conversations = [conv for conv in filtered_conversations if conv['product_name'] == product_filter]
-    
-    # Apply sorting
-    if sort_by == "Recent First":
-        filtered_conversations.sort(key=lambda x: x['last_message_time'], reverse=True)
-    elif sort_by == "Oldest First":
-        filtered_conversations.sort(key=lambda x: x['last_message_time'])
-    elif sort_by == "Most Messages":
-        filtered_conversations.sort(key=lambda x: x['message_count'], reverse=True)
-    
-    # Display conversations
-    if filtered_conversations:
-        for conversation in filtered_conversations:
-            # Create clickable conversation card
-            with st.container():
-                col1, col2, col3, col4 = st.columns([3, 2, 2, 1])
-                
-                with col1:
-                    st.markdown(f"**{conversation['product_name']}**")
-                    st.write(f"With: {conversation['sender_name']}")
-                    # Show latest subjects (truncated)
-                    subjects = conversation.get('subjects', '').split(';')[0]  # Get first subject
-                    if len(subjects) > 50:
-                        subjects = subjects[:50] + "..."
-                    st.caption(subjects)
-                
-                with col2:
-                    st.write(f"📧 {conversation['sender_email']}")
-                    st.write(f"💬 {conversation['message_count']} messages")
-                
-                with col3:
-                    if conversation['last_message_time']:
-                        time_str = conversation['last_message_time'].strftime('%b %d, %Y')
-                        st.write(f"🕒 {time_str}")
-                    
-                    if conversation['unread_count'] > 0:
-                        st.markdown(f'<span class="unread-badge">{conversation["unread_count"]} unread</span>', 
-                                   unsafe_allow_html=True)
-                
-                with col4:
-                    if st.button("💬 Open", key=f"open_{conversation['product_id']}_{conversation['sender_email']}", 
-                                use_container_width=True):
-                        st.session_state.current_conversation = conversation
-                        st.rerun()
-                
-                st.divider()
-        
-        # Summary stats
-        st.subheader("📊 Conversation Summary")
-        total_conversations = len(filtered_conversations)
-        total_unread = sum(conv['unread_count'] for conv in filtered_conversations)
-        total_messages = sum(conv['message_count'] for conv in filtered_conversations)
-        
-        col1, col2, col3 = st.columns(3)
-        with col1:
-            st.metric("Conversations", total_conversations)
-        with col2:
-            st.metric("Unread Messages", total_unread)
-        with col3:
-            st.metric("Total Messages", total_messages)
-            
-    else:
-        if show_filter == "Unread Only":
-            st.info("📬 No unread messages. Great job staying on top of your communications!")
-        else:
-            st.info("💬 No conversations yet. Start by browsing products and contacting sellers, or wait for buyers to reach out!")
-        
-        # Quick action buttons
-        col1, col2 = st.columns(2)
-        with col1:
-            if st.button("📝 Send New Message", use_container_width=True):
-                st.session_state.current_conversation = "new"
-                st.rerun()
-        with col2:
-            if st.button("🛍️ Browse Products", use_container_width=True):
-                st.switch_page("pages/1_Product_Listings.py")
+    render_conversation_list()
 
 # Footer with helpful tips
 st.divider()
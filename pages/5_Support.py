@@ -1,9 +1,12 @@
+import bisect
+import json
+import re
 import streamlit as st
-import pandas as pd
-from datetime import datetime
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 from utils.database_factory import create_database_service
-from utils.ai_assistant import AIAssistant
-from utils.ai_ui_components import AIUIComponents
+from utils.ai_ui_components import AIUIComponents, cached_ai_text, get_shared_ai_assistant
 
 st.set_page_config(
     page_title="Support - TrueCraft",
@@ -18,90 +21,172 @@ def get_database_service():
 
 db_manager = get_database_service()
 
+# Static markup, built once at import rather than on every rerun
+SUPPORT_HEADER_HTML = """
+<div class="support-header">
+    <h1>🆘 Customer Support Center</h1>
+    <p>Find answers, get help, and contact our support team</p>
+</div>
+"""
+
+# The three priority cards in one element, laid out by the .priority-grid CSS grid
+PRIORITY_CARDS_HTML = """
+<div class="priority-grid">
+    <div class="priority-high">
+        <h5>🚨 Urgent Technical Issues</h5>
+        <p>Platform not working, data loss, critical bugs</p>
+        <p><strong>Response:</strong> Within 2 hours</p>
+    </div>
+    <div class="priority-medium">
+        <h5>💼 General Support</h5>
+        <p>Account questions, feature requests, how-to guidance</p>
+        <p><strong>Response:</strong> Within 24 hours</p>
+    </div>
+    <div class="priority-low">
+        <h5>💡 Feedback & Suggestions</h5>
+        <p>Feature ideas, general feedback, success stories</p>
+        <p><strong>Response:</strong> Within 48 hours</p>
+    </div>
+</div>
+"""
+
+RESOURCE_LINK_HTML = (
+    '<div class="resource-link"><h5>{title}</h5>'
+    '<p>{description}</p>'
+    '<a href="{link}" target="_blank">Access Resource →</a></div>'
+)
+
+@st.cache_resource
+def get_io_executor():
+    """Worker threads for database writes that shouldn't block the page"""
+    return ThreadPoolExecutor(max_workers=2)
+
 # Initialize AI components safely
 def get_ai_assistant():
-    """Get AI assistant with error handling"""
-    try:
-        if 'ai_assistant' not in st.session_state:
-            st.session_state.ai_assistant = AIAssistant()
-        return st.session_state.ai_assistant
-    except Exception as e:
+    """Get the AI assistant shared across sessions and pages"""
+    ai_assistant = get_shared_ai_assistant()
+    if ai_assistant is None:
         st.warning("AI features are currently unavailable. Some functionality may be limited.")
+    return ai_assistant
+
+def with_ai(method_name, *args, error_message="AI unavailable"):
+    """Call an AIAssistant method through the shared result cache, showing an error and
+    returning None if the assistant is missing or the call fails"""
+    ai_assistant = get_ai_assistant()
+    if not ai_assistant:
+        st.error("AI features are currently unavailable.")
+        return None
+    try:
+        return cached_ai_text(ai_assistant, method_name, *args)
+    except Exception:
+        st.error(error_message)
         return None
 
-ai_ui = AIUIComponents()
+@st.cache_resource
+def get_ai_ui():
+    return AIUIComponents()
 
-# Custom CSS for support interface
-st.markdown("""
-<style>
-    .support-header {
-        text-align: center;
-        padding: 2rem 0;
-        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-        color: white;
-        border-radius: 10px;
-        margin-bottom: 2rem;
-    }
-    .faq-container {
-        background: #f8f9fa;
-        padding: 1.5rem;
-        border-radius: 8px;
-        margin-bottom: 1rem;
-        border-left: 4px solid #28a745;
-    }
-    .contact-form-container {
-        background: #f8f9fa;
-        padding: 1.5rem;
-        border-radius: 8px;
-        border: 1px solid #dee2e6;
-        margin-bottom: 1rem;
-    }
-    .help-category {
-        background: #e3f2fd;
-        padding: 1rem;
-        border-radius: 8px;
-        margin-bottom: 1rem;
-        border-left: 4px solid #2196f3;
-    }
-    .troubleshooting-card {
-        background: #fff3cd;
-        padding: 1rem;
-        border-radius: 8px;
-        margin-bottom: 1rem;
-        border-left: 4px solid #ffc107;
-    }
-    .resource-link {
-        background: #d1ecf1;
-        padding: 1rem;
-        border-radius: 8px;
-        margin-bottom: 0.5rem;
-        border-left: 4px solid #17a2b8;
-    }
-    .search-box {
-        margin-bottom: 1.5rem;
-    }
-    .priority-high {
-        background: #f8d7da;
-        border-left-color: #dc3545;
-    }
-    .priority-medium {
-        background: #fff3cd;
-        border-left-color: #ffc107;
-    }
-    .priority-low {
-        background: #d4edda;
-        border-left-color: #28a745;
-    }
-</style>
-""", unsafe_allow_html=True)
+ai_ui = get_ai_ui()
+
+# Custom CSS for support interface, read from disk once per process
+@st.cache_data
+def load_css(filename):
+    css_path = Path(__file__).resolve().parent.parent / "static" / filename
+    return f"<style>{css_path.read_text()}</style>"
+
+st.markdown(load_css("support.css"), unsafe_allow_html=True)
 
 # Header
-st.markdown("""
-<div class="support-header">
-    <h1>🆘 Customer Support Center</h1>
-    <p>Find answers, get help, and contact our support team</p>
+st.markdown(SUPPORT_HEADER_HTML, unsafe_allow_html=True)
+
+# FAQ, troubleshooting and resource content lives in a JSON asset, parsed once per process
+@st.cache_data
+def load_support_content():
+    content_path = Path(__file__).resolve().parent.parent / "static" / "support_content.json"
+    return json.loads(content_path.read_text(encoding="utf-8"))
+
+support_content = load_support_content()
+
+@st.cache_data
+def build_troubleshooting_html():
+    """(title, card HTML) for each troubleshooting guide; the content is static, so build it once"""
+    return [
+        (guide['title'], f"""
+<div class="troubleshooting-card">
+    <p><strong>Symptoms:</strong> {guide['symptoms']}</p>
+    <p><strong>Solutions to try:</strong></p>
+    <ul>
+        {''.join(f'<li>{solution}</li>' for solution in guide['solutions'])}
+    </ul>
+    <p><em>If none of these solutions work, please contact our support team with details about your specific situation.</em></p>
 </div>
-""", unsafe_allow_html=True)
+""")
+        for guide in load_support_content()['troubleshooting']
+    ]
+
+@st.cache_data
+def build_resources_html():
+    """(category, links HTML) for each resource category, built once from the static content"""
+    return [
+        (category, "".join(RESOURCE_LINK_HTML.format_map(resource) for resource in resources))
+        for category, resources in load_support_content()['resources'].items()
+    ]
+
+@st.cache_resource
+def build_faq_index():
+    """Flatten the FAQ content into (category, question, answer, question_lower, answer_lower) tuples
+    and build an inverted index from each word to the positions of the FAQs containing it, plus the
+    sorted vocabulary for prefix lookups"""
+    entries = [
+        (category, faq['question'], faq['answer'], faq['question'].lower(), faq['answer'].lower())
+        for category, faqs in load_support_content()['faq'].items()
+        for faq in faqs
+    ]
+    postings = defaultdict(set)
+    for position, entry in enumerate(entries):
+        for token in re.findall(r"\w+", f"{entry[3]} {entry[4]}"):
+            postings[token].add(position)
+    return entries, dict(postings), sorted(postings)
+
+def filter_faqs(faq_index, search_query, category):
+    """Filter the FAQ index by category and search text
+    
+    Every word of the query must appear in the question or answer, either as a
+    word or as the start of one ("image" matches "images"). A query word that
+    starts no indexed word, like a fragment from the middle of one, is matched
+    anywhere inside words instead. Queries with no word characters fall back to
+    a plain substring check.
+    """
+    entries, postings, vocabulary = faq_index
+    if search_query:
+        query_lower = search_query.lower()
+        tokens = re.findall(r"\w+", query_lower)
+        if tokens:
+            matches = None
+            for token in set(tokens):
+                token_matches = set()
+                # Words starting with the token, including the token itself, sit together in the sorted vocabulary
+                start = bisect.bisect_left(vocabulary, token)
+                end = bisect.bisect_left(vocabulary, token + "\U0010ffff", start)
+                for word in vocabulary[start:end]:
+                    token_matches |= postings[word]
+                if start == end:
+                    for word, positions in postings.items():
+                        if token in word:
+                            token_matches |= positions
+                matches = token_matches if matches is None else matches & token_matches
+                if not matches:
+                    break
+            entries = [entries[position] for position in sorted(matches)]
+        else:
+            entries = [entry for entry in entries if query_lower in entry[3] or query_lower in entry[4]]
+    
+    if category != "All":
+        entries = [entry for entry in entries if entry[0] == category]
+    
+    return entries
+
+faq_index = build_faq_index()
 
 # Initialize session state for search and filters
 if 'support_search_query' not in st.session_state:
@@ -109,197 +194,52 @@ if 'support_search_query' not in st.session_state:
 if 'selected_category' not in st.session_state:
     st.session_state.selected_category = "All"
 
-# Search and filter section
-st.markdown('<div class="search-box">', unsafe_allow_html=True)
-col1, col2 = st.columns([3, 1])
-with col1:
-    search_query = st.text_input("🔍 Search for help topics, FAQs, or keywords", 
-                                placeholder="Type your question or keyword...",
-                                value=st.session_state.support_search_query)
-    st.session_state.support_search_query = search_query
-
-with col2:
-    category_filter = st.selectbox("Filter by Category", 
-                                  ["All", "Account", "Products", "Orders", "Technical", "General"])
-    st.session_state.selected_category = category_filter
-st.markdown('</div>', unsafe_allow_html=True)
-
-# Main content tabs
-tab1, tab2, tab3, tab4, tab5 = st.tabs([
-    "📋 FAQ", 
-    "📞 Contact Support", 
-    "📚 Help Guides", 
-    "🔧 Troubleshooting", 
-    "📖 Resources"
-])
-
-with tab1:
-    st.subheader("❓ Frequently Asked Questions")
-    
-    # FAQ data with categories
-    faq_data = {
-        "Account": [
-            {
-                "question": "How do I create an artisan profile?",
-                "answer": "Go to the 'Artisan Profile' page from the main menu. Fill in your personal information, craft specialties, bio, and social media links. Use the AI assistant to help write compelling descriptions of your work and story."
-            },
-            {
-                "question": "Can I have multiple artisan profiles?",
-                "answer": "Currently, each account supports one artisan profile. You can update your profile anytime to reflect different specialties or add new craft categories."
-            },
-            {
-                "question": "How do I update my contact information?",
-                "answer": "Visit the 'Artisan Profile' page and edit your contact details including email, phone, website, and social media links. Don't forget to save your changes."
-            }
-        ],
-        "Products": [
-            {
-                "question": "How do I create a product listing?",
-                "answer": "Navigate to 'Product Listings' and click 'Add New Product'. Fill in product details like name, category, price, and description. Upload high-quality images and use our AI assistant to generate compelling descriptions and optimize pricing."
-            },
-            {
-                "question": "What image formats are supported?",
-                "answer": "We support JPEG, PNG, and WebP image formats. For best results, use high-resolution images (at least 1000x1000 pixels) with good lighting that showcase your product clearly."
-            },
-            {
-                "question": "How do I price my products competitively?",
-                "answer": "Use our AI-powered pricing suggestions in the Product Listings page. The system analyzes similar products, material costs, and market trends to recommend optimal pricing strategies."
-            },
-            {
-                "question": "Can I edit my product listings after publishing?",
-                "answer": "Yes! You can edit any product listing anytime. Go to 'Product Listings', find your product, and click 'Edit'. Changes are saved immediately and reflected on your marketplace presence."
-            }
-        ],
-        "Orders": [
-            {
-                "question": "How do I manage customer orders?",
-                "answer": "Customer orders are managed through the messaging system. When buyers are interested, they'll contact you directly through the Messages page. You can negotiate pricing, customization, and shipping details."
-            },
-            {
-                "question": "What payment methods do you support?",
-                "answer": "Currently, payment arrangements are handled directly between artisans and customers. We recommend using secure payment platforms like PayPal, Stripe, or established marketplace payment systems."
-            },
-            {
-                "question": "How do I handle shipping and delivery?",
-                "answer": "Set your shipping costs and processing times in your product listings. Coordinate delivery details with customers through the messaging system. Consider offering multiple shipping options for customer convenience."
-            }
-        ],
-        "Technical": [
-            {
-                "question": "The AI assistant isn't working. What should I do?",
-                "answer": "First, try refreshing the page. If the issue persists, check your internet connection. For persistent AI assistant issues, contact our technical support team using the form below."
-            },
-            {
-                "question": "My images won't upload. How can I fix this?",
-                "answer": "Ensure your images are under 10MB and in supported formats (JPEG, PNG, WebP). Try reducing the file size or converting to a different format. Clear your browser cache if problems continue."
-            },
-            {
-                "question": "How do I view analytics for my products?",
-                "answer": "Visit the 'Analytics' page to see detailed performance metrics including views, favorites, and engagement data for all your products. Use these insights to optimize your listings."
-            },
-            {
-                "question": "The page is loading slowly. What's wrong?",
-                "answer": "Slow loading can be caused by large images or poor internet connection. Try refreshing the page, checking your connection, or reducing image file sizes in your listings."
-            }
-        ],
-        "General": [
-            {
-                "question": "What is TrueCraft Marketplace Assistant?",
-                "answer": "TrueCraft is an AI-powered platform designed to help local artisans create compelling product listings, manage their online presence, and connect with customers. It provides tools for description writing, pricing optimization, and marketplace management."
-            },
-            {
-                "question": "Is there a cost to use the platform?",
-                "answer": "Please contact our support team for current pricing information and available plans. We offer various options to support artisans of all sizes."
-            },
-            {
-                "question": "How do I get started as a new artisan?",
-                "answer": "Start by creating your artisan profile, then add your first product listing. Use our AI tools to optimize descriptions and pricing. Check out the Help Guides tab for detailed getting started instructions."
-            },
-            {
-                "question": "Can customers contact me directly?",
-                "answer": "Yes! Customers can reach you through our secure messaging system. You'll receive notifications for new messages and can manage all communications from the Messages page."
-            }
-        ]
-    }
-    
-    # Filter FAQs based on search and category
-    def filter_faqs(faqs, search_query, category):
-        if category == "All":
-            all_faqs = []
-            for cat, questions in faqs.items():
-                for q in questions:
-                    all_faqs.append((cat, q))
-            filtered_faqs = all_faqs
-        else:
-            filtered_faqs = [(category, q) for q in faqs.get(category, [])]
+# The FAQ search is a fragment so searching reruns only this block, not every tab
+@st.fragment
+def faq_search_fragment(faq_index):
+    # Search and filter section; a form so results update on Search/Enter rather than per keystroke
+    st.markdown('<div class="search-box">', unsafe_allow_html=True)
+    with st.form("faq_search_form", border=False):
+        col1, col2 = st.columns([3, 1])
+        with col1:
+            search_query = st.text_input("🔍 Search for help topics, FAQs, or keywords", 
+                                        placeholder="Type your question or keyword...",
+                                        value=st.session_state.support_search_query)
         
-        if search_query:
-            query_lower = search_query.lower()
-            filtered_faqs = [
-                (cat, q) for cat, q in filtered_faqs 
-                if query_lower in q['question'].lower() or query_lower in q['answer'].lower()
-            ]
+        with col2:
+            category_filter = st.selectbox("Filter by Category", 
+                                          ["All", "Account", "Products", "Orders", "Technical", "General"])
         
-        return filtered_faqs
+        if st.form_submit_button("Search"):
+            st.session_state.support_search_query = search_query
+            st.session_state.selected_category = category_filter
+    st.markdown('</div>', unsafe_allow_html=True)
     
-    filtered_faqs = filter_faqs(faq_data, search_query, category_filter)
+    filtered_faqs = filter_faqs(faq_index, st.session_state.support_search_query,
+                                st.session_state.selected_category)
     
     if filtered_faqs:
-        for category, faq in filtered_faqs:
-            with st.expander(f"**[{category}]** {faq['question']}"):
-                st.markdown(f'<div class="faq-container">{faq["answer"]}</div>', unsafe_allow_html=True)
+        for category, question, answer, _, _ in filtered_faqs:
+            with st.expander(f"**[{category}]** {question}"):
+                st.markdown(f'<div class="faq-container">{answer}</div>', unsafe_allow_html=True)
     else:
         st.info("No FAQs found matching your search. Try different keywords or contact support.")
 
-with tab2:
-    st.subheader("📞 Contact Support")
-    
-    st.markdown("""
-    <div class="contact-form-container">
-        <h4>🎯 Quick Contact Options</h4>
-        <p>Choose the best way to get help based on your needs:</p>
-    </div>
-    """, unsafe_allow_html=True)
-    
-    # Contact options
-    col1, col2, col3 = st.columns(3)
-    
-    with col1:
-        st.markdown("""
-        <div class="priority-high">
-            <h5>🚨 Urgent Technical Issues</h5>
-            <p>Platform not working, data loss, critical bugs</p>
-            <p><strong>Response:</strong> Within 2 hours</p>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    with col2:
-        st.markdown("""
-        <div class="priority-medium">
-            <h5>💼 General Support</h5>
-            <p>Account questions, feature requests, how-to guidance</p>
-            <p><strong>Response:</strong> Within 24 hours</p>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    with col3:
-        st.markdown("""
-        <div class="priority-low">
-            <h5>💡 Feedback & Suggestions</h5>
-            <p>Feature ideas, general feedback, success stories</p>
-            <p><strong>Response:</strong> Within 48 hours</p>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    st.divider()
-    
-    # AI-Powered Support Ticket Assistant
-    ai_ui.ai_powered_form_section(
-        "🤖 AI Support Ticket Assistant", 
-        "Get intelligent assistance for writing clear, effective support tickets that get faster responses!"
-    )
-    
-    # AI Support Ticket Helper (outside form)
+# Polls a ticket being written in the background, then reruns the page to show the outcome
+@st.fragment(run_every=1)
+def ticket_submission_status():
+    future = st.session_state.get('ticket_future')
+    if future is None:
+        return
+    if future.done():
+        st.session_state.ticket_submitted = future.result()
+        del st.session_state.ticket_future
+        st.rerun()
+    st.info("⏳ Submitting your support ticket...")
+
+# AI Support Ticket Helper (outside form); a fragment so its buttons don't rerun the other tabs
+@st.fragment
+def ai_ticket_helper():
     with st.expander("✨ AI Support Ticket Helper", expanded=False):
         col1, col2 = st.columns(2)
         
@@ -311,51 +251,29 @@ with tab2:
             ], key="ticket_template_type")
             
             if st.button("Generate Ticket Template", key="gen_ticket_btn"):
-                ai_assistant = get_ai_assistant()
-                if ai_assistant:
-                    try:
-                        with st.spinner("Creating ticket template..."):
-                            ticket_content = ai_assistant.generate_support_ticket(
-                                template_type, 
-                                f"Help with {template_type.lower()}", 
-                                "medium"
-                            )
-                            st.session_state['generated_ticket'] = ticket_content
-                            st.success("Ticket template generated!")
-                            st.rerun()
-                    except:
-                        st.error("AI unavailable")
-                else:
-                    st.error("AI features are currently unavailable.")
+                with st.spinner("Creating ticket template..."):
+                    ticket_content = with_ai("generate_support_ticket", template_type,
+                                             f"Help with {template_type.lower()}", "medium")
+                if ticket_content:
+                    st.session_state['generated_ticket'] = ticket_content
+                    st.success("Ticket template generated!")
         
         with col2:
             st.markdown("**🔧 Improve Your Ticket**")
-            if 'current_ticket_desc' in st.session_state and st.session_state.current_ticket_desc:
+            if st.session_state.get("description_input"):
                 if st.button("✨ Improve Description", key="improve_ticket_btn"):
-                    ai_assistant = get_ai_assistant()
-                    if ai_assistant:
-                        try:
-                            with st.spinner("Improving ticket..."):
-                                improved = ai_assistant.improve_text(st.session_state.current_ticket_desc, "professional")
-                                st.session_state['improved_ticket'] = improved
-                                st.success("Description improved!")
-                                st.rerun()
-                        except:
-                            st.error("AI unavailable")
-                    else:
-                        st.error("AI features are currently unavailable.")
+                    with st.spinner("Improving ticket..."):
+                        improved = with_ai("improve_text", st.session_state.description_input, "professional")
+                    if improved:
+                        st.session_state['improved_ticket'] = improved
+                        st.success("Description improved!")
                 
                 if st.button("💡 Get Writing Tips", key="ticket_tips_btn"):
-                    ai_assistant = get_ai_assistant()
-                    if ai_assistant:
-                        try:
-                            with st.spinner("Getting tips..."):
-                                tips = ai_assistant.quick_improve_suggestions(st.session_state.current_ticket_desc, "general")
-                                st.info(tips)
-                        except:
-                            st.error("Tips unavailable")
-                    else:
-                        st.error("AI features are currently unavailable.")
+                    with st.spinner("Getting tips..."):
+                        tips = with_ai("quick_improve_suggestions", st.session_state.description_input, "general",
+                                       error_message="Tips unavailable")
+                    if tips:
+                        st.info(tips)
             else:
                 st.info("Write your ticket description first to get improvement suggestions")
         
@@ -367,6 +285,34 @@ with tab2:
         if 'improved_ticket' in st.session_state:
             st.markdown("**Improved Description:**")
             st.text_area("Copy this improved description:", st.session_state['improved_ticket'], height=100, key="improved_desc_display")
+
+def render_faq():
+    st.subheader("❓ Frequently Asked Questions")
+    
+    faq_search_fragment(faq_index)
+
+def render_contact_support():
+    st.subheader("📞 Contact Support")
+    
+    st.markdown("""
+    <div class="contact-form-container">
+        <h4>🎯 Quick Contact Options</h4>
+        <p>Choose the best way to get help based on your needs:</p>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    # Contact options
+    st.markdown(PRIORITY_CARDS_HTML, unsafe_allow_html=True)
+    
+    st.divider()
+    
+    # AI-Powered Support Ticket Assistant
+    ai_ui.ai_powered_form_section(
+        "🤖 AI Support Ticket Assistant", 
+        "Get intelligent assistance for writing clear, effective support tickets that get faster responses!"
+    )
+    
+    ai_ticket_helper()
     
     # Support ticket form
     st.subheader("📝 Submit Support Ticket")
@@ -391,25 +337,21 @@ with tab2:
             ])
         
         subject = st.text_input("Subject*", 
-                               value=st.session_state.get('ticket_subject', ''),
                                placeholder="Brief description of your issue",
                                key="subject_input")
-        st.session_state['ticket_subject'] = subject
         
         description = st.text_area(
             "Detailed Description*", 
-            value=st.session_state.get('current_ticket_desc', ''),
             placeholder="Please provide as much detail as possible about your issue, including steps to reproduce if it's a technical problem...",
             height=150,
             key="description_input"
         )
-        st.session_state['current_ticket_desc'] = description
         
-        # Character count for description
+        # Character count for description, as a native progress bar toward the 100-character goal
         if description:
             char_count = len(description)
-            color = "green" if char_count > 100 else "orange" if char_count > 50 else "red"
-            st.markdown(f"<small style='color: {color}'>{char_count} characters (aim for 100+ for detailed support)</small>", unsafe_allow_html=True)
+            st.progress(min(char_count / 100, 1.0),
+                        text=f"{char_count} characters (aim for 100+ for detailed support)")
         
         # Attachment info
         st.info("📎 For files or screenshots, please mention them in your description and we'll follow up with secure upload instructions.")
@@ -429,16 +371,21 @@ with tab2:
                     'is_read': False
                 }
                 
-                success = db_manager.send_message(ticket_data)
-                if success:
-                    st.success("🎉 Support ticket submitted successfully! We'll respond according to the priority level you selected.")
-                    st.balloons()
-                else:
-                    st.error("❌ Failed to submit support ticket. Please try again or contact us directly.")
+                # Write in the background; ticket_submission_status reports the outcome
+                st.session_state.ticket_future = get_io_executor().submit(db_manager.send_message, ticket_data)
             else:
                 st.error("⚠️ Please fill in all required fields marked with *")
+    
+    if 'ticket_submitted' in st.session_state:
+        if st.session_state.pop('ticket_submitted'):
+            st.success("🎉 Support ticket submitted successfully! We'll respond according to the priority level you selected.")
+            st.balloons()
+        else:
+            st.error("❌ Failed to submit support ticket. Please try again or contact us directly.")
+    elif 'ticket_future' in st.session_state:
+        ticket_submission_status()
 
-with tab3:
+def render_help_guides():
     st.subheader("📚 Help Guides & Getting Started")
     
     # Getting Started Guide
@@ -545,83 +492,12 @@ with tab3:
         
         st.markdown('</div>', unsafe_allow_html=True)
 
-with tab4:
+def render_troubleshooting():
     st.subheader("🔧 Troubleshooting Common Issues")
     
-    # Common technical issues
-    troubleshooting_guides = [
-        {
-            "title": "🖼️ Image Upload Problems",
-            "symptoms": "Images won't upload, error messages, or very slow uploads",
-            "solutions": [
-                "Check file size: Images must be under 10MB",
-                "Verify format: Use JPEG, PNG, or WebP only",
-                "Try compressing images using online tools",
-                "Clear browser cache and cookies",
-                "Try a different browser or device",
-                "Check internet connection stability"
-            ]
-        },
-        {
-            "title": "🤖 AI Assistant Not Responding",
-            "symptoms": "AI suggestions not loading, timeout errors, or blank responses",
-            "solutions": [
-                "Refresh the page and try again",
-                "Check your internet connection",
-                "Try with shorter input text",
-                "Clear browser cache",
-                "Disable browser extensions temporarily",
-                "Contact support if issue persists"
-            ]
-        },
-        {
-            "title": "💾 Data Not Saving",
-            "symptoms": "Changes lost after saving, form submissions failing",
-            "solutions": [
-                "Ensure all required fields are filled",
-                "Check for stable internet connection",
-                "Don't navigate away while saving",
-                "Try saving smaller chunks of data",
-                "Clear browser cache and reload",
-                "Use a different browser to test"
-            ]
-        },
-        {
-            "title": "📊 Analytics Not Updating",
-            "symptoms": "View counts not increasing, outdated data in analytics",
-            "solutions": [
-                "Analytics update every few hours",
-                "Refresh the analytics page",
-                "Check if you're viewing your own products (self-views don't count)",
-                "Wait 24 hours for data synchronization",
-                "Contact support for persistent issues"
-            ]
-        },
-        {
-            "title": "💬 Messages Not Appearing",
-            "symptoms": "Missing messages, notifications not working",
-            "solutions": [
-                "Check spam/junk folders for email notifications",
-                "Verify your email address in profile settings",
-                "Refresh the Messages page",
-                "Check message filters and categories",
-                "Ensure JavaScript is enabled in browser"
-            ]
-        }
-    ]
-    
-    for guide in troubleshooting_guides:
-        with st.expander(f"**{guide['title']}**"):
-            st.markdown(f"""
-            <div class="troubleshooting-card">
-                <p><strong>Symptoms:</strong> {guide['symptoms']}</p>
-                <p><strong>Solutions to try:</strong></p>
-                <ul>
-                    {''.join([f'<li>{solution}</li>' for solution in guide['solutions']])}
-                </ul>
-                <p><em>If none of these solutions work, please contact our support team with details about your specific situation.</em></p>
-            </div>
-            """, unsafe_allow_html=True)
+    for title, card_html in build_troubleshooting_html():
+        with st.expander(f"**{title}**"):
+            st.markdown(card_html, unsafe_allow_html=True)
     
     # Self-help tools
     st.divider()
@@ -653,47 +529,13 @@ with tab4:
             Please update your browser if you're using an older version.
             """)
 
-with tab5:
+def render_resources():
     st.subheader("📖 Resources & Documentation")
     
-    # Resource categories
-    resource_categories = {
-        "📱 Platform Resources": [
-            {"title": "User Manual (PDF)", "description": "Complete guide to using all platform features", "link": "#"},
-            {"title": "Video Tutorials", "description": "Step-by-step video guides for common tasks", "link": "#"},
-            {"title": "API Documentation", "description": "For developers integrating with our platform", "link": "#"},
-            {"title": "Mobile App Guide", "description": "Using ArtisanAI on mobile devices", "link": "#"}
-        ],
-        "🎨 Artisan Resources": [
-            {"title": "Photography Tips Guide", "description": "Professional tips for product photography", "link": "#"},
-            {"title": "Pricing Calculator", "description": "Tool to help calculate fair pricing for your work", "link": "#"},
-            {"title": "Market Research Tools", "description": "Understand your competition and target market", "link": "#"},
-            {"title": "Craft Business Basics", "description": "Legal and business considerations for artisans", "link": "#"}
-        ],
-        "🤝 Community": [
-            {"title": "Artisan Forum", "description": "Connect with other artisans and share experiences", "link": "#"},
-            {"title": "Success Stories", "description": "Learn from successful artisans on our platform", "link": "#"},
-            {"title": "Monthly Newsletters", "description": "Tips, updates, and featured artisans", "link": "#"},
-            {"title": "Events & Workshops", "description": "Online and local events for skill building", "link": "#"}
-        ],
-        "🔧 Technical Support": [
-            {"title": "System Status", "description": "Current platform status and known issues", "link": "#"},
-            {"title": "Release Notes", "description": "Latest features and improvements", "link": "#"},
-            {"title": "Browser Requirements", "description": "Technical requirements and compatibility", "link": "#"},
-            {"title": "Data Export Tools", "description": "Download your data and analytics", "link": "#"}
-        ]
-    }
-    
-    for category, resources in resource_categories.items():
+    for category, links_html in build_resources_html():
         with st.expander(f"**{category}**", expanded=False):
-            for resource in resources:
-                st.markdown(f"""
-                <div class="resource-link">
-                    <h5>{resource['title']}</h5>
-                    <p>{resource['description']}</p>
-                    <a href="{resource['link']}" target="_blank">Access Resource →</a>
-                </div>
-                """, unsafe_allow_html=True)
+            # All of a category's links in one markdown element
+            st.markdown(links_html, unsafe_allow_html=True)
     
     st.divider()
     
@@ -723,16 +565,28 @@ with tab5:
         - 🎫 Support Tickets: Use form above (recommended)
         """)
 
+# Main content sections; a radio instead of st.tabs so only the selected section's body runs
+support_sections = {
+    "📋 FAQ": render_faq,
+    "📞 Contact Support": render_contact_support,
+    "📚 Help Guides": render_help_guides,
+    "🔧 Troubleshooting": render_troubleshooting,
+    "📖 Resources": render_resources
+}
+active_section = st.radio("Section", list(support_sections), horizontal=True,
+                          key="support_tab", label_visibility="collapsed")
+support_sections[active_section]()
+
 # Footer with helpful links
 st.divider()
 st.markdown("""
-<div style="text-align: center; padding: 2rem 0; background: #f8f9fa; border-radius: 8px;">
+<div class="support-footer">
     <h4>🎨 Need More Help?</h4>
     <p>We're here to support your artisan journey every step of the way!</p>
     <p><strong>Quick Links:</strong> 
-        <a href="#" style="margin: 0 10px;">Privacy Policy</a> | 
-        <a href="#" style="margin: 0 10px;">Terms of Service</a> | 
-        <a href="#" style="margin: 0 10px;">Community Guidelines</a>
+        <a href="#">Privacy Policy</a> | 
+        <a href="#">Terms of Service</a> | 
+        <a href="#">Community Guidelines</a>
     </p>
 </div>
 """, unsafe_allow_html=True)
\ No newline at end of file
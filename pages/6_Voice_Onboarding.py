@@ -1,12 +1,24 @@
 import streamlit as st
+import hashlib
 import tempfile
 import os
-from utils.ai_assistant import AIAssistant
+import atexit
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from utils.ai_ui_components import get_shared_ai_assistant
 from utils.database_factory import create_database_service
+from utils.onboarding_steps import LANGUAGES, ONBOARDING_STEPS, NUM_STEPS, STEP_TITLES_BY_INDEX
 
-# Initialize services
-ai_assistant = AIAssistant()
-db_manager = create_database_service()
+# Initialize services once per process rather than on every rerun
+@st.cache_resource
+def get_database_service():
+    return create_database_service()
+
+db_manager = get_database_service()
+ai_assistant = get_shared_ai_assistant()
+if ai_assistant is None:
+    st.error("AI features are currently unavailable, so voice onboarding can't run right now.")
+    st.stop()
 
 st.set_page_config(
     page_title="Voice Onboarding - TrueCraft",
@@ -14,49 +26,54 @@ st.set_page_config(
     layout="wide"
 )
 
-# Custom CSS for voice interface
-st.markdown("""
-<style>
-    .voice-container {
-        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-        padding: 2rem;
-        border-radius: 15px;
-        margin: 1rem 0;
-        color: white;
-    }
-    .step-indicator {
-        background: rgba(255, 255, 255, 0.1);
-        padding: 1rem;
-        border-radius: 10px;
-        margin: 1rem 0;
-    }
-    .recording-button {
-        font-size: 2rem;
-        padding: 1rem 2rem;
-        border-radius: 50px;
-        border: none;
-        background: #ff6b6b;
-        color: white;
-        cursor: pointer;
-    }
-</style>
-""", unsafe_allow_html=True)
+def is_fallback_guidance(guidance):
+    """True for the assistant's unavailable/failed message rather than real guidance"""
+    return not ai_assistant.enabled or guidance.startswith("AI guidance temporarily unavailable")
+
+@st.cache_data(ttl=3600, show_spinner=False, max_entries=256)
+def _cached_guidance(step_name, input_hash, language, _user_input):
+    """Memoize step guidance by step, input hash and language; the raw input is left out of the cache key.
+    
+    Fallback messages raise instead of returning, so a failed call is never cached.
+    """
+    guidance = ai_assistant.voice_onboarding_guide(step_name, _user_input, language)
+    if is_fallback_guidance(guidance):
+        raise RuntimeError(guidance)
+    return guidance
+
+def get_step_guidance(step_name, user_input, language):
+    """Cached AI guidance for an onboarding step, or the assistant's fallback message"""
+    input_hash = hashlib.blake2b(user_input.encode(), digest_size=8).hexdigest()
+    try:
+        return _cached_guidance(step_name, input_hash, language, user_input)
+    except RuntimeError as e:
+        return str(e)
+
+@st.cache_resource
+def get_prefetch_executor():
+    """Worker threads that fetch the next step's guidance while the user answers the current one"""
+    return ThreadPoolExecutor(max_workers=2)
+
+# Custom CSS for voice interface, read from disk once per process
+@st.cache_data
+def load_css(filename):
+    css_path = Path(__file__).resolve().parent.parent / "static" / filename
+    return f"<style>{css_path.read_text()}</style>"
+
+st.markdown(load_css("voice_onboarding.css"), unsafe_allow_html=True)
 
 # Header
-st.markdown('<div class="voice-container">', unsafe_allow_html=True)
-st.title("🎙️ AI-Powered Voice Onboarding")
-st.markdown("*Welcome to TrueCraft! Let's tell your story in your own voice and language.*")
-st.markdown('</div>', unsafe_allow_html=True)
+st.markdown("""
+<div class="voice-container">
+    <h1>🎙️ AI-Powered Voice Onboarding</h1>
+    <p><em>Welcome to TrueCraft! Let's tell your story in your own voice and language.</em></p>
+</div>
+""", unsafe_allow_html=True)
 
 # Language selection
-languages = [
-    "English", "Spanish", "French", "Hindi", "Mandarin", "Arabic", 
-    "Portuguese", "Bengali", "Russian", "Japanese", "German", "Italian"
-]
-
 col1, col2 = st.columns(2)
 with col1:
-    selected_language = st.selectbox("🌍 Choose your preferred language:", languages)
+    selected_language = st.selectbox("🌍 Choose your preferred language:", LANGUAGES)
 with col2:
     voice_mode = st.selectbox("🎯 Onboarding mode:", ["Guided Interview", "Free Form", "Quick Setup"])
 
@@ -68,49 +85,34 @@ if 'onboarding_data' not in st.session_state:
 if 'voice_responses' not in st.session_state:
     st.session_state.voice_responses = []
 
-# Onboarding steps
-onboarding_steps = [
-    "welcome",
-    "craft_expertise", 
-    "business_goals",
-    "product_portfolio",
-    "cultural_heritage",
-    "sustainability",
-    "pricing_strategy",
-    "market_positioning"
-]
-
-step_titles = {
-    "welcome": "🌟 Welcome to TrueCraft",
-    "craft_expertise": "🎨 Your Craft & Expertise", 
-    "business_goals": "🎯 Business Goals",
-    "product_portfolio": "📦 Product Portfolio",
-    "cultural_heritage": "🏛️ Cultural Heritage",
-    "sustainability": "🌱 Sustainability Practices",
-    "pricing_strategy": "💰 Pricing Strategy",
-    "market_positioning": "📈 Market Positioning"
-}
-
 # Progress indicator
 current_step = st.session_state.onboarding_step
-progress_percent = (current_step / len(onboarding_steps)) * 100
+progress_percent = (current_step / NUM_STEPS) * 100
 
-st.markdown(f'<div class="step-indicator">', unsafe_allow_html=True)
 st.progress(progress_percent / 100)
-st.markdown(f"**Step {current_step + 1} of {len(onboarding_steps)}:** {step_titles.get(onboarding_steps[current_step], 'Setup')}")
-st.markdown('</div>', unsafe_allow_html=True)
+st.markdown(
+    f'<div class="step-indicator"><strong>Step {current_step + 1} of {NUM_STEPS}:</strong> {STEP_TITLES_BY_INDEX[current_step]}</div>',
+    unsafe_allow_html=True
+)
 
 # Current step content
-if current_step < len(onboarding_steps):
-    current_step_name = onboarding_steps[current_step]
+if current_step < NUM_STEPS:
+    current_step_name = ONBOARDING_STEPS[current_step]
     
-    # Get AI guidance for current step
+    # Get AI guidance for current step, reusing the prefetched result when it was fetched for these inputs
     user_input = st.session_state.get('last_voice_input', '')
-    ai_guidance = ai_assistant.voice_onboarding_guide(
-        current_step_name, 
-        user_input, 
-        selected_language
-    )
+    guidance_key = (current_step_name, user_input, selected_language)
+    prefetched = st.session_state.get('_next_guidance')
+    last_guide = st.session_state.get('_last_guide_key')
+    if last_guide and last_guide[0] == guidance_key:
+        ai_guidance = last_guide[1]
+    elif prefetched and prefetched[0] == guidance_key:
+        ai_guidance = prefetched[1].result()
+    else:
+        ai_guidance = get_step_guidance(*guidance_key)
+    # Remember real guidance so reruns with the same inputs skip the lookup; failures are retried
+    if not is_fallback_guidance(ai_guidance):
+        st.session_state._last_guide_key = (guidance_key, ai_guidance)
     
     # Display AI guidance
     st.markdown("### 🤖 AI Guide")
@@ -141,37 +143,74 @@ if current_step < len(onboarding_steps):
     )
     
     if uploaded_audio is not None:
-        # Save uploaded file temporarily
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.wav') as tmp_file:
-            tmp_file.write(uploaded_audio.getvalue())
-            tmp_file_path = tmp_file.name
+        # Transcribe each distinct upload once; reruns reuse the stored result
+        audio_key = hashlib.blake2b(uploaded_audio.getbuffer(), digest_size=16).hexdigest()
+        transcriptions = st.session_state.setdefault('transcription_cache', {})
+        transcription_result = transcriptions.get(audio_key)
         
-        try:
+        if transcription_result is None:
+            # One staging file per session, removed when the server exits
+            tmp_file_path = st.session_state.get('_audio_tmp')
+            if tmp_file_path is None:
+                fd, tmp_file_path = tempfile.mkstemp(suffix='.wav')
+                os.close(fd)
+                atexit.register(lambda path=tmp_file_path: os.path.exists(path) and os.unlink(path))
+                st.session_state._audio_tmp = tmp_file_path
+            
+            # Only rewrite it for a different upload. It's scratch input for transcription, so write straight
+            # from the upload's buffer (no bytes copy) over the old contents and skip any fsync
+            if st.session_state.get('_audio_tmp_hash') != audio_key:
+                fd = os.open(tmp_file_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+                try:
+                    with uploaded_audio.getbuffer() as audio_bytes:
+                        written = 0
+                        while written < len(audio_bytes):
+                            written += os.write(fd, audio_bytes[written:])
+                finally:
+                    os.close(fd)
+                st.session_state._audio_tmp_hash = audio_key
+            
             # Transcribe audio
             transcription_result = ai_assistant.transcribe_audio(tmp_file_path)
             
-            if transcription_result['error']:
-                st.error(f"Transcription failed: {transcription_result['error']}")
-            else:
-                st.success("Audio transcribed successfully!")
-                transcribed_text = transcription_result['text']
-                st.write(f"**Transcribed text:** {transcribed_text}")
-                
-                # Translate if needed
-                if selected_language != "English":
+            # Failures aren't kept, so the next run tries again
+            if not transcription_result['error']:
+                transcriptions[audio_key] = transcription_result
+        
+        if transcription_result['error']:
+            st.error(f"Transcription failed: {transcription_result['error']}")
+        else:
+            st.success("Audio transcribed successfully!")
+            transcribed_text = transcription_result['text']
+            st.write(f"**Transcribed text:** {transcribed_text}")
+            
+            # Translate if needed; audio already detected as English needs no translation
+            if selected_language != "English" and transcription_result.get('language') != 'en':
+                translation_key = (hashlib.blake2b(transcribed_text.encode(), digest_size=16).hexdigest(), selected_language)
+                translations = st.session_state.setdefault('translation_cache', {})
+                translation_result = translations.get(translation_key)
+                if translation_result is None:
                     translation_result = ai_assistant.translate_text(transcribed_text, "English")
                     if not translation_result['error']:
-                        st.write(f"**English translation:** {translation_result['translated_text']}")
-                        text_response = translation_result['translated_text']
-                    else:
-                        text_response = transcribed_text
+                        translations[translation_key] = translation_result
+                if not translation_result['error']:
+                    st.write(f"**English translation:** {translation_result['translated_text']}")
+                    text_response = translation_result['translated_text']
                 else:
                     text_response = transcribed_text
-        
-        finally:
-            # Clean up temporary file
-            if os.path.exists(tmp_file_path):
-                os.unlink(tmp_file_path)
+            else:
+                text_response = transcribed_text
+    
+    # Once the user has a response, start fetching the next step's guidance for it. Only one
+    # prefetch per step, so editing the response doesn't spend API calls on every change
+    if current_step < NUM_STEPS - 1 and text_response:
+        next_key = (ONBOARDING_STEPS[current_step + 1], text_response, selected_language)
+        pending = st.session_state.get('_next_guidance')
+        if not pending or pending[0][0] != next_key[0]:
+            st.session_state._next_guidance = (
+                next_key,
+                get_prefetch_executor().submit(get_step_guidance, *next_key)
+            )
     
     # Action buttons
     col1, col2, col3 = st.columns(3)
@@ -189,7 +228,7 @@ if current_step < len(onboarding_steps):
                 st.session_state.last_voice_input = text_response
                 
                 # Move to next step
-                if current_step < len(onboarding_steps) - 1:
+                if current_step < NUM_STEPS - 1:
                     st.session_state.onboarding_step += 1
                     st.success("Response saved! Moving to next step...")
                     st.rerun()
@@ -201,7 +240,7 @@ if current_step < len(onboarding_steps):
     
     with col3:
         if st.button("⏩ Skip Step"):
-            if current_step < len(onboarding_steps) - 1:
+            if current_step < NUM_STEPS - 1:
                 st.session_state.onboarding_step += 1
                 st.rerun()
 
@@ -213,55 +252,32 @@ else:
     if st.session_state.onboarding_data:
         st.markdown("### 📋 Your Generated Profile")
         
-        # Cultural storytelling
-        if st.button("🏛️ Generate Cultural Story", use_container_width=True):
-            artisan_data = {
-                'name': st.session_state.onboarding_data.get('welcome', 'Unknown'),
-                'craft': st.session_state.onboarding_data.get('craft_expertise', 'Various crafts'),
-                'culture': st.session_state.onboarding_data.get('cultural_heritage', 'Not specified'),
-                'experience': 'Experienced artisan',
-                'techniques': st.session_state.onboarding_data.get('craft_expertise', 'Traditional methods'),
-                'heritage': st.session_state.onboarding_data.get('cultural_heritage', 'Family traditions')
-            }
-            
-            cultural_story = ai_assistant.cultural_storytelling(
-                artisan_data.get('culture', 'Not specified'),
-                artisan_data.get('craft', 'Various crafts'), 
-                artisan_data.get('heritage', 'Family traditions')
-            )
-            st.markdown("#### 🌟 Your Cultural Story")
-            st.write(cultural_story)
-        
-        # Business analysis
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            if st.button("💼 Generate Business Plan", use_container_width=True):
-                business_guidance = ai_assistant.financial_literacy_guidance(
-                    "business planning",
-                    "beginner",
-                    f"Artisan specializing in {st.session_state.onboarding_data.get('craft_expertise', 'handmade products')}"
+        # One request covers the cultural story, business plan and sustainability assessment
+        if st.button("✨ Generate Full Profile", use_container_width=True):
+            onboarding_data = st.session_state.onboarding_data
+            with st.spinner("Generating your profile..."):
+                st.session_state.profile_bundle = ai_assistant.generate_profile_bundle(
+                    onboarding_data.get('cultural_heritage', 'Not specified'),
+                    onboarding_data.get('craft_expertise', 'Various crafts'),
+                    onboarding_data.get('cultural_heritage', 'Family traditions'),
+                    onboarding_data.get('sustainability', 'Traditional materials')
                 )
-                st.markdown("#### 📈 Business Guidance")
-                st.write(business_guidance)
         
-        with col2:
-            if st.button("🌱 Sustainability Assessment", use_container_width=True):
-                product_data = {
-                    'materials': st.session_state.onboarding_data.get('sustainability', 'Traditional materials'),
-                    'production_method': 'Handmade',
-                    'origin': 'Local artisan',
-                    'packaging': 'Eco-friendly'
-                }
-                
-                sustainability = ai_assistant.sustainability_assessment(
-                    product_data.get('materials', 'Traditional materials'),
-                    product_data.get('production_method', 'Handmade'),
-                    product_data.get('packaging', 'Eco-friendly')
-                )
-                
+        profile_bundle = st.session_state.get('profile_bundle')
+        if profile_bundle:
+            st.markdown("#### 🌟 Your Cultural Story")
+            st.write(profile_bundle['cultural_story'])
+            
+            # Business analysis
+            col1, col2 = st.columns(2)
+            
+            with col1:
+                st.markdown("#### 📈 Business Guidance")
+                st.write(profile_bundle['business_guidance'])
+            
+            with col2:
                 st.markdown("#### 🌿 Sustainability Assessment")
-                st.write(sustainability)
+                st.write(profile_bundle['sustainability_assessment'])
     
     # Action buttons
     col1, col2, col3 = st.columns(3)
@@ -280,6 +296,7 @@ else:
             st.session_state.onboarding_step = 0
             st.session_state.onboarding_data = {}
             st.session_state.voice_responses = []
+            st.session_state.pop('profile_bundle', None)
             st.rerun()
 
 # Sidebar with help and resources
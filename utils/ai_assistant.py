@@ -1,7 +1,19 @@
+import atexit
+import hashlib
 import json
 import os
+import random
+import sqlite3
+import threading
+import time
+import zlib
 import requests
-from typing import Optional, Dict, Any
+from requests.adapters import HTTPAdapter
+from collections import OrderedDict
+from pathlib import Path
+from types import MappingProxyType
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Optional, Dict, Any, Callable, List, Iterator
 
 # Import i18n support
 try:
@@ -11,6 +23,275 @@ except ImportError:
     I18N_AVAILABLE = False
     i18n = None
 
+# Use publicly available models that work with most API keys
+HF_API_BASE_URL = "https://api-inference.huggingface.co/models/"
+DEFAULT_HEAVY_MODEL = "microsoft/DialoGPT-medium"
+DEFAULT_LIGHT_MODEL = "microsoft/DialoGPT-small"
+
+# Short, structurally simple generations that the smaller model handles just as well
+LIGHT_TASKS = frozenset({
+    "generate_message_template",
+    "generate_review_template",
+    "improve_text",
+    "quick_improve_suggestions",
+    "generate_social_media_post",
+})
+
+# One pooled HTTP session per process: every AIAssistant call reuses its
+# keep-alive connections instead of paying a new TCP + TLS handshake
+_HTTP_SESSION = requests.Session()
+_HTTP_SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16))
+atexit.register(_HTTP_SESSION.close)
+
+# Rate limits, server errors and model cold starts (503) are worth retrying;
+# other failures, like a bad request or a rejected API key, are returned straight away
+RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+RETRY_ATTEMPTS = 4
+RETRY_BASE_DELAY = 1.0
+RETRY_MAX_DELAY = 8.0
+
+class _CircuitBreaker:
+    """Fails fast for a while after repeated upstream failures instead of queueing more doomed requests.
+    
+    Callers record one outcome per request, after its retries, so a single request that
+    needs several attempts counts as at most one failure.
+    """
+    
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._half_open_in_flight = False
+        self._lock = threading.Lock()
+    
+    def allow(self) -> bool:
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if self._half_open_in_flight or time.monotonic() - self._opened_at < self.reset_timeout:
+                return False
+            # Half-open: a single trial request decides whether the circuit closes or re-opens
+            self._half_open_in_flight = True
+            return True
+    
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._half_open_in_flight = False
+    
+    def record_failure(self):
+        with self._lock:
+            if self._half_open_in_flight:
+                self._half_open_in_flight = False
+                self._opened_at = time.monotonic()
+                return
+            self._failures += 1
+            if self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+
+_CIRCUIT_BREAKER = _CircuitBreaker()
+
+# Lookup tables the prompt builders draw from, shared read-only instead of rebuilt per call
+PLATFORM_GUIDELINES = MappingProxyType({
+    "Instagram": "Visual-focused, use relevant hashtags, engaging captions",
+    "Facebook": "Community-oriented, longer form content acceptable", 
+    "Twitter": "Concise, punchy, use relevant hashtags",
+    "General": "Adaptable to multiple platforms"
+})
+
+MESSAGE_TEMPLATE_TYPES = MappingProxyType({
+    "inquiry": "professional inquiry asking for product details, customization options, or availability",
+    "custom_order": "request for custom product modifications or personalized items",
+    "shipping": "question about shipping costs, delivery times, and packaging options", 
+    "payment": "discussion about payment methods, pricing, or invoicing",
+    "follow_up": "follow-up message after initial contact or order placement",
+    "thank_you": "appreciation message after purchase or interaction",
+    "complaint": "professional complaint or concern about product or service",
+    "general": "general business inquiry or introduction"
+})
+
+IMPROVEMENT_TYPES = MappingProxyType({
+    "grammar": "Correct grammar, spelling, and punctuation while maintaining the original tone and meaning",
+    "clarity": "Improve clarity and readability while keeping the core message intact", 
+    "professional": "Make the text more professional while maintaining a personal touch",
+    "engaging": "Make the text more engaging and compelling for potential customers",
+    "concise": "Make the text more concise without losing important information",
+    "general": "Improve overall quality including grammar, clarity, and engagement"
+})
+
+# Byte-identical opening of every persona prompt (see _build_payload). The artisan framing lives here once instead of being
+# restated in each prompt, and a shared prefix lets the inference server reuse its cached
+# computation for it across requests
+ARTISAN_CONTEXT = (
+    "You are an expert copywriter and business consultant for independent artisans and makers "
+    "of handmade products. Write in a warm, personal, authentic voice that respects craftsmanship. "
+    "Avoid clichés and corporate jargon."
+)
+
+# Shared decoder for pulling a JSON value out of a longer reply
+_JSON_DECODER = json.JSONDecoder()
+
+# Only near-deterministic generations are worth answering from the cache;
+# creative helpers are expected to give a fresh variation on each request
+CACHEABLE_MAX_TEMPERATURE = 0.3
+
+# Where cached responses persist across restarts; set TRUECRAFT_AI_CACHE_PATH to "" to keep them in memory only
+DEFAULT_AI_CACHE_PATH = "data/ai_cache.db"
+
+class _DiskCache:
+    """SQLite store of zlib-compressed responses, shared by worker processes and kept across restarts"""
+    
+    def __init__(self, path: str, max_entries: int = 50000, touch_interval: float = 60):
+        self.max_entries = max_entries
+        # Eviction only needs approximate LRU order, so a hit refreshes accessed_at at most this often
+        self.touch_interval = touch_interval
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=5, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # Losing the last few cached responses on power loss is harmless; an fsync per commit isn't
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+        self._lock = threading.Lock()
+        self._writes = 0
+    
+    def get(self, key: str) -> Optional[tuple]:
+        """(text, expires_at as a Unix time) for a live entry, else None"""
+        now = time.time()
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT value, expires_at, accessed_at FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+                if row is None or row[1] < now:
+                    return None
+                # Most hits stay read-only and never take SQLite's write lock
+                if now - row[2] >= self.touch_interval:
+                    self._conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+                    self._conn.commit()
+            return zlib.decompress(row[0]).decode("utf-8"), row[1]
+        except (sqlite3.Error, zlib.error) as e:
+            print(f"AI cache error: {str(e)}")
+            return None
+    
+    def set(self, key: str, value: str, expires_at: float):
+        now = time.time()
+        try:
+            with self._lock:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO responses (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)",
+                    (key, zlib.compress(value.encode("utf-8"), 6), expires_at, now)
+                )
+                # Prune now and then rather than on every write
+                self._writes += 1
+                if self._writes % 100 == 0:
+                    self._conn.execute("DELETE FROM responses WHERE expires_at < ?", (now,))
+                    self._conn.execute(
+                        "DELETE FROM responses WHERE key IN ("
+                        "SELECT key FROM responses ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                        (self.max_entries,)
+                    )
+                self._conn.commit()
+        except sqlite3.Error as e:
+            print(f"AI cache error: {str(e)}")
+
+def _open_disk_cache() -> Optional[_DiskCache]:
+    """The persistent response cache, or None when disabled or the path isn't writable"""
+    path = os.getenv("TRUECRAFT_AI_CACHE_PATH", DEFAULT_AI_CACHE_PATH)
+    if not path:
+        return None
+    try:
+        return _DiskCache(path)
+    except (OSError, sqlite3.Error) as e:
+        print(f"AI cache unavailable, using memory only: {str(e)}")
+        return None
+
+class _ResponseCache:
+    """Thread-safe LRU of generated text with a per-entry time to live, backed by an optional disk cache"""
+    
+    def __init__(self, max_entries: int = 10000, ttl: float = 3600, disk: Optional[_DiskCache] = None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.disk = disk
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def make_key(url: str, payload: Dict[str, Any]) -> str:
+        """Stable key for an Inference API request"""
+        raw = json.dumps({"url": url, "payload": payload}, sort_keys=True)
+        return hashlib.sha256(raw.encode()).hexdigest()
+    
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at >= time.monotonic():
+                    self._entries.move_to_end(key)
+                    return value
+                del self._entries[key]
+        
+        if self.disk is None:
+            return None
+        stored = self.disk.get(key)
+        if stored is None:
+            return None
+        value, expires_at = stored
+        self._remember(key, value, expires_at - time.time())
+        return value
+    
+    def set(self, key: str, value: str, ttl: Optional[float] = None):
+        ttl = self.ttl if ttl is None else ttl
+        self._remember(key, value, ttl)
+        if self.disk is not None:
+            self.disk.set(key, value, time.time() + ttl)
+    
+    def _remember(self, key: str, value: str, ttl: float):
+        expires_at = time.monotonic() + ttl
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+class _SingleFlight:
+    """Coalesces concurrent calls with the same key into one, like Go's singleflight.
+    
+    The first caller for a key runs the function; callers arriving while it is still
+    running wait for and share its result (or exception) instead of repeating the work.
+    """
+    
+    def __init__(self):
+        self._calls: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+    
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            future = self._calls.get(key)
+            owner = future is None
+            if owner:
+                future = self._calls[key] = Future()
+        if not owner:
+            return future.result()
+        
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
 class AIAssistant:
     def __init__(self):
         # Using Hugging Face API for AI features
@@ -25,6 +306,16 @@ class AIAssistant:
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json"
         }
+        
+        # Model per task tier; the environment variables allow swapping models for A/B tests
+        self.models = {
+            "heavy": os.getenv("TRUECRAFT_HEAVY_MODEL", DEFAULT_HEAVY_MODEL),
+            "light": os.getenv("TRUECRAFT_LIGHT_MODEL", DEFAULT_LIGHT_MODEL),
+        }
+        
+        # Identical low-temperature requests are answered from memory, or from disk after a restart
+        self._cache = _ResponseCache(disk=_open_disk_cache())
+        self._inflight = _SingleFlight()
     
     def _check_enabled(self):
         """Check if AI features are enabled, return error message if not"""
@@ -34,52 +325,193 @@ class AIAssistant:
             return "AI assistance temporarily unavailable. Please configure HUGGINGFACE_API_KEY to enable AI features."
         return None
     
-    def _generate_content(self, prompt: str, use_json: bool = False, max_output_tokens: int = 300, temperature: float = 0.7, target_language: Optional[str] = None):
-        """Helper method to generate content using Hugging Face API"""
+    def _pick_model(self, task: Optional[str]) -> str:
+        """Model tier for a helper: light for short simple outputs, otherwise heavy"""
+        return "light" if task in LIGHT_TASKS else "heavy"
+    
+    def _model_url(self, task: Optional[str] = None) -> str:
+        """Inference API endpoint of the model that should serve ``task``"""
+        return HF_API_BASE_URL + self.models[self._pick_model(task)]
+    
+    def _build_payload(self, prompt: str, use_json: bool = False, max_output_tokens: int = 300, temperature: float = 0.7, target_language: Optional[str] = None, stop: Optional[List[str]] = None, persona: bool = True) -> Dict[str, Any]:
+        """Build the Inference API request body, applying language and JSON instructions.
+        
+        ``persona`` opens the prompt with ARTISAN_CONTEXT; turn it off for translation and
+        JSON output, where a copywriting voice would compete with the instructions.
+        """
+        # Add language support to prompt if available
+        if target_language and I18N_AVAILABLE and i18n and hasattr(i18n, 'generate_ai_prompt_in_language'):
+            try:
+                prompt = i18n.generate_ai_prompt_in_language(prompt, target_language)
+            except:
+                # Skip language modification if it fails
+                pass
+        
+        # Add JSON instruction to prompt if needed
+        if use_json:
+            prompt += "\n\nPlease respond in valid JSON format only."
+        
+        parameters = {
+            "max_new_tokens": max_output_tokens,
+            "temperature": temperature,
+            "return_full_text": False
+        }
+        # Stop sequences end generation as soon as the expected format is complete
+        if stop:
+            parameters["stop"] = stop
+        
+        if persona:
+            prompt = f"{ARTISAN_CONTEXT}\n\n{prompt}"
+        return {"inputs": prompt, "parameters": parameters}
+    
+    def _post(self, url: str, payload: Dict[str, Any], stream: bool = False) -> Optional[requests.Response]:
+        """POST to the Inference API, retrying retryable failures with jittered exponential backoff.
+        
+        Returns the final response, or None while the circuit breaker is open. Connection
+        errors and timeouts that persist through every attempt are raised.
+        """
+        if not _CIRCUIT_BREAKER.allow():
+            print("AI API Error: too many recent failures, skipping request")
+            return None
+        
         try:
-            if not self.enabled:
-                return None
-            
-            # Add language support to prompt if available
-            if target_language and I18N_AVAILABLE and i18n and hasattr(i18n, 'generate_ai_prompt_in_language'):
+            for attempt in range(RETRY_ATTEMPTS):
+                last_attempt = attempt == RETRY_ATTEMPTS - 1
+                
                 try:
-                    prompt = i18n.generate_ai_prompt_in_language(prompt, target_language)
-                except:
-                    # Skip language modification if it fails
-                    pass
-            
-            # Add JSON instruction to prompt if needed
-            if use_json:
-                prompt += "\n\nPlease respond in valid JSON format only."
+                    response = _HTTP_SESSION.post(url, headers=self.headers, json=payload, timeout=15, stream=stream)
+                except (requests.ConnectionError, requests.Timeout) as e:
+                    if last_attempt:
+                        raise
+                    print(f"AI API Error: {str(e)}, retrying")
+                else:
+                    if response.status_code not in RETRYABLE_STATUS_CODES:
+                        _CIRCUIT_BREAKER.record_success()
+                        return response
+                    if last_attempt:
+                        _CIRCUIT_BREAKER.record_failure()
+                        return response
+                    print(f"HuggingFace API Error: {response.status_code}, retrying")
+                    response.close()
                 
-            # Use a publicly available model that works with most API keys
-            api_url = "https://api-inference.huggingface.co/models/microsoft/DialoGPT-medium"
+                time.sleep(random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** attempt)))
+        except Exception:
+            _CIRCUIT_BREAKER.record_failure()
+            raise
+    
+    def _generate_content(self, prompt: str, use_json: bool = False, max_output_tokens: int = 300, temperature: float = 0.7, target_language: Optional[str] = None, task: Optional[str] = None, stop: Optional[List[str]] = None, persona: bool = True):
+        """Helper method to generate content using Hugging Face API; ``task`` selects the model tier"""
+        try:
+            if not self.enabled:
+                return None
             
-            payload = {
-                "inputs": prompt,
-                "parameters": {
-                    "max_new_tokens": max_output_tokens,
-                    "temperature": temperature,
-                    "return_full_text": False
-                }
-            }
+            payload = self._build_payload(prompt, use_json, max_output_tokens, temperature, target_language, stop, persona)
+            url = self._model_url(task)
             
-            response = requests.post(api_url, headers=self.headers, json=payload, timeout=15)
+            if temperature <= CACHEABLE_MAX_TEMPERATURE:
+                request_key = _ResponseCache.make_key(url, payload)
+                cached = self._cache.get(request_key)
+                if cached is not None:
+                    return cached
+                # Identical requests already in flight on other threads share that call's result
+                return self._inflight.do(request_key, lambda: self._request_text(url, payload, request_key))
             
-            if response.status_code == 200:
-                result = response.json()
-                if isinstance(result, list) and len(result) > 0:
-                    return result[0].get('generated_text', '').strip()
-                return ''
-            else:
-                print(f"HuggingFace API Error: {response.status_code} - {response.text}")
-                return None
+            # Creative generations are sampled fresh for every caller, so they are neither cached nor shared
+            return self._request_text(url, payload)
                 
         except Exception as e:
             # Log error server-side for debugging, return None to trigger proper error handling
             print(f"AI API Error: {str(e)}")
             return None
     
+    def _request_text(self, url: str, payload: Dict[str, Any], cache_key: Optional[str] = None) -> Optional[str]:
+        """Send one generation request; the text is cached under ``cache_key`` when one is given"""
+        response = self._post(url, payload)
+        if response is None:
+            return None
+        
+        if response.status_code == 200:
+            result = response.json()
+            if isinstance(result, list) and len(result) > 0:
+                text = result[0].get('generated_text', '').strip()
+                if cache_key and text:
+                    self._cache.set(cache_key, text)
+                return text
+            return ''
+        else:
+            print(f"HuggingFace API Error: {response.status_code} - {response.text}")
+            return None
+    
+    def _stream_content(self, prompt: str, max_output_tokens: int = 300, temperature: float = 0.7, target_language: Optional[str] = None) -> Iterator[str]:
+        """Yield generated text piece by piece using the Inference API's server-sent events"""
+        fallback = "AI assistance temporarily unavailable. Please try again later."
+        if not self.enabled:
+            yield self._check_enabled()
+            return
+        
+        payload = self._build_payload(prompt, max_output_tokens=max_output_tokens, temperature=temperature, target_language=target_language)
+        payload["stream"] = True
+        
+        produced = False
+        try:
+            # Retries only cover getting the stream started; once tokens flow they are passed on as-is
+            response = self._post(self._model_url(), payload, stream=True)
+            if response is not None:
+                with response:
+                    if response.status_code != 200:
+                        print(f"HuggingFace API Error: {response.status_code} - {response.text}")
+                    else:
+                        for line in response.iter_lines(decode_unicode=True):
+                            if not line or not line.startswith("data:"):
+                                continue
+                            token = json.loads(line[len("data:"):]).get("token") or {}
+                            if token.get("text") and not token.get("special"):
+                                produced = True
+                                yield token["text"]
+        except Exception as e:
+            print(f"AI API Error: {str(e)}")
+        
+        if not produced:
+            yield fallback
+    
+    def _parse_json_reply(self, content: str) -> Any:
+        """Parse a JSON reply, tolerating code fences or prose around it.
+        
+        When the whole reply isn't valid JSON, the first complete object or array inside it
+        is used, which saves another API call when the model wraps its JSON in explanation.
+        Raises ValueError if no JSON value can be recovered.
+        """
+        clean_content = content.strip()
+        if clean_content.startswith('```json'):
+            clean_content = clean_content.replace('```json', '').replace('```', '').strip()
+        elif clean_content.startswith('```'):
+            clean_content = clean_content.replace('```', '').strip()
+        
+        try:
+            return json.loads(clean_content)
+        except ValueError:
+            pass
+        
+        for start, char in enumerate(clean_content):
+            if char in "{[":
+                try:
+                    return _JSON_DECODER.raw_decode(clean_content, start)[0]
+                except ValueError:
+                    continue
+        raise ValueError("No JSON value found in AI response")
+    
+    def run_concurrently(self, *tasks: Callable[[], Any]) -> List[Any]:
+        """Run several AI helper calls at once and return their results in order.
+        
+        Each task is a zero-argument callable, e.g. ``lambda: self.improve_text(text)``.
+        The HTTP calls spend their time waiting on the network, so threads let the
+        requests overlap instead of queueing one after another.
+        """
+        if len(tasks) <= 1:
+            return [task() for task in tasks]
+        with ThreadPoolExecutor(max_workers=min(4, len(tasks))) as executor:
+            return list(executor.map(lambda task: task(), tasks))
+    
     def generate_product_description(self, name, category, materials, price=None, target_language=None):
         """Generate compelling product descriptions for artisan products"""
         
@@ -153,19 +585,13 @@ class AIAssistant:
         """
         
         try:
-            content = self._generate_content(prompt, use_json=True, max_output_tokens=200, temperature=0.3)
+            content = self._generate_content(prompt, use_json=True, max_output_tokens=120, temperature=0.3, persona=False)
             if content:
-                # Clean the content in case of code fences or extra formatting
-                clean_content = content.strip()
-                if clean_content.startswith('```json'):
-                    clean_content = clean_content.replace('```json', '').replace('```', '').strip()
-                elif clean_content.startswith('```'):
-                    clean_content = clean_content.replace('```', '').strip()
-                
-                data = json.loads(clean_content)
+                # Recovers the JSON even when it comes wrapped in code fences or prose
+                data = self._parse_json_reply(content)
                 
                 # Validate required keys exist
-                if 'min_price' in data and 'max_price' in data and 'reasoning' in data:
+                if isinstance(data, dict) and 'min_price' in data and 'max_price' in data and 'reasoning' in data:
                     return data
                 else:
                     return {"min_price": 0, "max_price": 0, "reasoning": "AI response format invalid."}
@@ -198,7 +624,6 @@ class AIAssistant:
         - Highlight their passion and expertise
         - Be 2-3 paragraphs long
         - Connect with potential customers emotionally
-        - Sound authentic and avoid clichés
         - Include their creative process or philosophy
         
         Write in first person and make it warm and approachable.
@@ -217,43 +642,27 @@ class AIAssistant:
         if not self.enabled:
             return "AI assistance temporarily unavailable. Please configure HUGGINGFACE_API_KEY to enable AI features."
         
-        platform_guidelines = {
-            "Instagram": "Visual-focused, use relevant hashtags, engaging captions",
-            "Facebook": "Community-oriented, longer form content acceptable", 
-            "Twitter": "Concise, punchy, use relevant hashtags",
-            "General": "Adaptable to multiple platforms"
-        }
-        
         prompt = f"""
         Create a {tone.lower()} social media post for {platform} about: {topic}
         
-        Platform considerations: {platform_guidelines.get(platform, "General social media")}
+        Platform considerations: {PLATFORM_GUIDELINES.get(platform, "General social media")}
         
         The post should:
         - Match the {tone.lower()} tone
-        - Be appropriate for artisan/maker audience
         - Include a call-to-action if relevant
-        - Be engaging and authentic
+        - Be engaging
         - Include 3-5 relevant hashtags
         - Stay within typical character limits for the platform
         
         Make it personal and showcase the human side of the craft business.
         """
         
-        content = self._generate_content(prompt, max_output_tokens=200, temperature=0.8)
+        content = self._generate_content(prompt, max_output_tokens=140, temperature=0.8, task="generate_social_media_post")
         return content.strip() if content else "AI assistance temporarily unavailable. Please try again later."
     
-    def generate_custom_content(self, content_type, context, specific_request, target_language=None):
-        """Generate custom content based on user specifications"""
-        
-        error_msg = self._check_enabled()
-        if error_msg:
-            return error_msg
-        
-        if not self.enabled:
-            return "AI assistance temporarily unavailable. Please configure HUGGINGFACE_API_KEY to enable AI features."
-        
-        prompt = f"""
+    def _custom_content_prompt(self, content_type, context, specific_request):
+        """Prompt shared by generate_custom_content and stream_custom_content"""
+        return f"""
         Help create {content_type} content with this context:
         
         Context: {context}
@@ -262,17 +671,31 @@ class AIAssistant:
         
         Create content that:
         - Directly addresses the specific request
-        - Is appropriate for an artisan/maker business
         - Maintains a professional yet personal tone
         - Is practical and actionable
-        - Reflects authenticity and craftsmanship values
         
         Provide clear, well-structured content that the user can immediately use.
         """
+    
+    def generate_custom_content(self, content_type, context, specific_request, target_language=None):
+        """Generate custom content based on user specifications"""
+        
+        error_msg = self._check_enabled()
+        if error_msg:
+            return error_msg
+        
+        if not self.enabled:
+            return "AI assistance temporarily unavailable. Please configure HUGGINGFACE_API_KEY to enable AI features."
         
+        prompt = self._custom_content_prompt(content_type, context, specific_request)
         content = self._generate_content(prompt, max_output_tokens=500, temperature=0.7, target_language=target_language)
         return content.strip() if content else "AI assistance temporarily unavailable. Please try again later."
     
+    def stream_custom_content(self, content_type, context, specific_request, target_language=None):
+        """Streaming variant of generate_custom_content, for use with st.write_stream"""
+        prompt = self._custom_content_prompt(content_type, context, specific_request)
+        return self._stream_content(prompt, max_output_tokens=500, temperature=0.7, target_language=target_language)
+    
     def analyze_product_image(self, image_data, mime_type=None):
         """Analyze product images to suggest improvements or generate descriptions"""
         
@@ -315,9 +738,13 @@ class AIAssistant:
         return content.strip() if content else "AI guidance temporarily unavailable. Please try again later."
     
     def transcribe_audio(self, audio_file_path):
-        """Transcribe audio to text"""
+        """Transcribe audio to text.
+        
+        Returns ``text``, ``error`` and ``language``, the detected language code
+        (e.g. ``"en"``) or None when the service doesn't report one.
+        """
         # Note: Audio transcription requires specialized models not available in basic HuggingFace API
-        return {"text": "", "error": "Audio transcription not yet implemented with HuggingFace. Consider using Whisper API or similar service."}
+        return {"text": "", "language": None, "error": "Audio transcription not yet implemented with HuggingFace. Consider using Whisper API or similar service."}
     
     def translate_text(self, text, target_language):
         """Translate text to target language"""
@@ -337,7 +764,7 @@ class AIAssistant:
         Provide only the translation, no additional text or explanation.
         """
         
-        content = self._generate_content(prompt, max_output_tokens=200, temperature=0.3, target_language=target_language)
+        content = self._generate_content(prompt, max_output_tokens=200, temperature=0.3, target_language=target_language, persona=False)
         if content:
             return {"translated_text": content.strip(), "error": None}
         else:
@@ -356,18 +783,7 @@ class AIAssistant:
         product_context = f" about {product_name}" if product_name else ""
         additional_context = f"Additional context: {context}" if context else ""
         
-        templates = {
-            "inquiry": "professional inquiry asking for product details, customization options, or availability",
-            "custom_order": "request for custom product modifications or personalized items",
-            "shipping": "question about shipping costs, delivery times, and packaging options", 
-            "payment": "discussion about payment methods, pricing, or invoicing",
-            "follow_up": "follow-up message after initial contact or order placement",
-            "thank_you": "appreciation message after purchase or interaction",
-            "complaint": "professional complaint or concern about product or service",
-            "general": "general business inquiry or introduction"
-        }
-        
-        template_description = templates.get(message_type, templates["general"])
+        template_description = MESSAGE_TEMPLATE_TYPES.get(message_type, MESSAGE_TEMPLATE_TYPES["general"])
         
         prompt = f"""
         Create a professional, friendly message template for {message_type} communication{product_context}.
@@ -380,14 +796,12 @@ class AIAssistant:
         - Professional yet warm and personal tone
         - Clear and concise language
         - Include placeholders [like this] where users can customize
-        - Appropriate for artisan/handmade product context
-        - Show respect for craftsmanship and quality
         - 2-4 sentences maximum
         
         Make it ready-to-use with minimal editing needed.
         """
         
-        content = self._generate_content(prompt, max_output_tokens=200, temperature=0.7)
+        content = self._generate_content(prompt, max_output_tokens=110, temperature=0.7, task="generate_message_template")
         return content.strip() if content else "AI assistance temporarily unavailable. Please try again later."
     
     def improve_text(self, original_text, improvement_type="general"):
@@ -400,16 +814,7 @@ class AIAssistant:
         if not self.enabled:
             return "AI assistance temporarily unavailable. Please configure HUGGINGFACE_API_KEY to enable AI features."
         
-        improvement_types = {
-            "grammar": "Correct grammar, spelling, and punctuation while maintaining the original tone and meaning",
-            "clarity": "Improve clarity and readability while keeping the core message intact", 
-            "professional": "Make the text more professional while maintaining a personal touch",
-            "engaging": "Make the text more engaging and compelling for potential customers",
-            "concise": "Make the text more concise without losing important information",
-            "general": "Improve overall quality including grammar, clarity, and engagement"
-        }
-        
-        instruction = improvement_types.get(improvement_type, improvement_types["general"])
+        instruction = IMPROVEMENT_TYPES.get(improvement_type, IMPROVEMENT_TYPES["general"])
         
         prompt = f"""
         Please improve this text by focusing on: {instruction}
@@ -420,14 +825,13 @@ class AIAssistant:
         Requirements:
         - Maintain the original meaning and intent
         - Keep the personal, artisan-friendly tone
-        - Make it suitable for handmade/craft business context
         - Preserve any specific details or technical information
         - Don't make it overly formal or corporate
         
         Provide only the improved text without additional commentary.
         """
         
-        content = self._generate_content(prompt, max_output_tokens=300, temperature=0.3)
+        content = self._generate_content(prompt, max_output_tokens=300, temperature=0.3, task="improve_text")
         return content.strip() if content else "AI assistance temporarily unavailable. Please try again later."
     
     def generate_seo_optimized_title(self, product_name, category, keywords=""):
@@ -461,12 +865,12 @@ class AIAssistant:
         content = self._generate_content(prompt, max_output_tokens=300, temperature=0.7)
         return content.strip() if content else "AI assistance temporarily unavailable. Please try again later."
     
-    def generate_pricing_analysis(self, product_name, materials, time_hours, skill_level, category):
-        """Generate comprehensive pricing analysis"""
+    def generate_pricing_analysis(self, product_name, materials, time_hours, skill_level, category, stream=False):
+        """Generate comprehensive pricing analysis; stream=True returns a token generator for st.write_stream"""
         
         error_msg = self._check_enabled()
         if error_msg:
-            return error_msg
+            return iter([error_msg]) if stream else error_msg
         
         if not self.enabled:
             return "AI assistance temporarily unavailable. Please configure HUGGINGFACE_API_KEY to enable AI features."
@@ -490,6 +894,9 @@ class AIAssistant:
         Provide practical, actionable pricing strategy.
         """
         
+        if stream:
+            return self._stream_content(prompt, max_output_tokens=400, temperature=0.5)
+        
         content = self._generate_content(prompt, max_output_tokens=400, temperature=0.5)
         return content.strip() if content else "AI assistance temporarily unavailable. Please try again later."
     
@@ -571,6 +978,52 @@ class AIAssistant:
         content = self._generate_content(prompt, max_output_tokens=400, temperature=0.6)
         return content.strip() if content else "AI assistance temporarily unavailable. Please try again later."
     
+    def generate_profile_bundle(self, cultural_background, craft_tradition, personal_story, materials_used):
+        """Generate the cultural story, business guidance and sustainability assessment in one request.
+        
+        Returns a dict with cultural_story, business_guidance and sustainability_assessment.
+        If the reply isn't the expected JSON, the three sections are generated separately
+        (concurrently) with the single-purpose helpers instead.
+        """
+        error_msg = self._check_enabled()
+        if error_msg:
+            return dict.fromkeys(("cultural_story", "business_guidance", "sustainability_assessment"), error_msg)
+        
+        prompt = f"""Create three short profile sections for a handmade artisan:
+        - Cultural background: {cultural_background}
+        - Craft tradition: {craft_tradition}
+        - Personal story: {personal_story}
+        - Materials: {materials_used}
+        
+        Provide your response in JSON format with:
+        - cultural_story: storytelling that honors the cultural heritage and connects the craft to its history (string)
+        - business_guidance: beginner business-planning guidance on pricing, cash flow and expenses for this artisan (string)
+        - sustainability_assessment: recommendations for sustainable sourcing, eco-friendly production and packaging (string)
+        """
+        
+        try:
+            content = self._generate_content(prompt, use_json=True, max_output_tokens=900, temperature=0.6, persona=False)
+            if content:
+                data = self._parse_json_reply(content)
+                sections = ("cultural_story", "business_guidance", "sustainability_assessment")
+                if all(isinstance(data.get(key), str) and data[key].strip() for key in sections):
+                    return {key: data[key].strip() for key in sections}
+        except Exception:
+            pass
+        
+        cultural_story, business_guidance, sustainability = self.run_concurrently(
+            lambda: self.cultural_storytelling(cultural_background, craft_tradition, personal_story),
+            lambda: self.financial_literacy_guidance(
+                "business planning", "beginner", f"Artisan specializing in {craft_tradition}"
+            ),
+            lambda: self.sustainability_assessment(materials_used, "Handmade", "Eco-friendly")
+        )
+        return {
+            "cultural_story": cultural_story,
+            "business_guidance": business_guidance,
+            "sustainability_assessment": sustainability
+        }
+    
     def generate_review_template(self, product_category, rating=5):
         """Generate thoughtful review templates for customers"""
         error_msg = self._check_enabled()
@@ -581,7 +1034,27 @@ class AIAssistant:
         Include placeholders [like this], sound authentic, mention craftsmanship quality.
         Make it 2-3 sentences that customers can customize."""
         
-        content = self._generate_content(prompt, max_output_tokens=200, temperature=0.7)
+        content = self._generate_content(prompt, max_output_tokens=200, temperature=0.7, task="generate_review_template")
+        return content.strip() if content else "AI assistance temporarily unavailable. Please try again later."
+    
+    def generate_support_ticket(self, issue_type, summary, priority="medium"):
+        """Generate a support ticket template the user can fill in"""
+        error_msg = self._check_enabled()
+        if error_msg:
+            return error_msg
+        
+        prompt = f"""Write a short support ticket template for a {priority}-priority {issue_type} on a handmade marketplace platform.
+        
+        Summary: {summary}
+        
+        Include placeholders for:
+        - What happened and what was expected
+        - Steps to reproduce (if applicable)
+        - Browser/device and when it started
+        
+        Keep it clear and concise so support can respond quickly."""
+        
+        content = self._generate_content(prompt, max_output_tokens=250, temperature=0.5, persona=False)
         return content.strip() if content else "AI assistance temporarily unavailable. Please try again later."
     
     def quick_improve_suggestions(self, text, field_type="general"):
@@ -600,15 +1073,15 @@ class AIAssistant:
         
         Focus on clarity, appeal, and artisan/handmade qualities."""
         
-        content = self._generate_content(prompt, max_output_tokens=200, temperature=0.6)
+        content = self._generate_content(prompt, max_output_tokens=140, temperature=0.6, task="quick_improve_suggestions", stop=["\n\n\n"])
         return content.strip() if content else "AI assistance temporarily unavailable. Please try again later."
     
-    def generate_seasonal_marketing_content(self, products_list, season_or_holiday, target_audience):
-        """Generate seasonal marketing content"""
+    def generate_seasonal_marketing_content(self, products_list, season_or_holiday, target_audience, stream=False):
+        """Generate seasonal marketing content; stream=True returns a token generator for st.write_stream"""
         
         error_msg = self._check_enabled()
         if error_msg:
-            return error_msg
+            return iter([error_msg]) if stream else error_msg
         
         if not self.enabled:
             return "AI assistance temporarily unavailable. Please configure HUGGINGFACE_API_KEY to enable AI features."
@@ -630,15 +1103,18 @@ class AIAssistant:
         Make it festive and relevant to the season.
         """
         
+        if stream:
+            return self._stream_content(prompt, max_output_tokens=400, temperature=0.7)
+        
         content = self._generate_content(prompt, max_output_tokens=400, temperature=0.7)
         return content.strip() if content else "AI assistance temporarily unavailable. Please try again later."
     
-    def generate_brand_voice_analysis(self, bio, products_description, target_customers):
-        """Generate brand voice analysis and recommendations"""
+    def generate_brand_voice_analysis(self, bio, products_description, target_customers, stream=False):
+        """Generate brand voice analysis and recommendations; stream=True returns a token generator for st.write_stream"""
         
         error_msg = self._check_enabled()
         if error_msg:
-            return error_msg
+            return iter([error_msg]) if stream else error_msg
         
         if not self.enabled:
             return "AI assistance temporarily unavailable. Please configure HUGGINGFACE_API_KEY to enable AI features."
@@ -660,14 +1136,17 @@ class AIAssistant:
         Help define a clear brand voice strategy.
         """
         
+        if stream:
+            return self._stream_content(prompt, max_output_tokens=400, temperature=0.6)
+        
         content = self._generate_content(prompt, max_output_tokens=400, temperature=0.6)
         return content.strip() if content else "AI assistance temporarily unavailable. Please try again later."
 
-    def generate_content_calendar(self, business_type, posting_frequency, special_events):
-        """Generate content calendar suggestions"""
+    def generate_content_calendar(self, business_type, posting_frequency, special_events, stream=False):
+        """Generate content calendar suggestions; stream=True returns a token generator for st.write_stream"""
         error_msg = self._check_enabled()
         if error_msg:
-            return error_msg
+            return iter([error_msg]) if stream else error_msg
         
         prompt = f"""Create content calendar suggestions for:
         - Business type: {business_type}
@@ -676,14 +1155,17 @@ class AIAssistant:
         
         Include weekly themes, post types, seasonal ideas, and engagement strategies."""
         
+        if stream:
+            return self._stream_content(prompt, max_output_tokens=400, temperature=0.7)
+        
         content = self._generate_content(prompt, max_output_tokens=400, temperature=0.7)
         return content.strip() if content else "AI assistance temporarily unavailable. Please try again later."
     
-    def generate_competitive_analysis(self, product_type, price_range, unique_features):
-        """Generate competitive analysis and positioning advice"""
+    def generate_competitive_analysis(self, product_type, price_range, unique_features, stream=False):
+        """Generate competitive analysis and positioning advice; stream=True returns a token generator for st.write_stream"""
         error_msg = self._check_enabled()
         if error_msg:
-            return error_msg
+            return iter([error_msg]) if stream else error_msg
         
         prompt = f"""Provide competitive analysis for:
         - Product type: {product_type}
@@ -692,5 +1174,8 @@ class AIAssistant:
         
         Cover positioning strategies, differentiation, and competitive advantages."""
         
+        if stream:
+            return self._stream_content(prompt, max_output_tokens=400, temperature=0.6)
+        
         content = self._generate_content(prompt, max_output_tokens=400, temperature=0.6)
         return content.strip() if content else "AI assistance temporarily unavailable. Please try again later."
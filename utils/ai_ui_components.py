@@ -1,8 +1,47 @@
 import streamlit as st
 from utils.ai_assistant import AIAssistant
+import itertools
 import time
 from utils.i18n import i18n, t
 
+@st.cache_data(ttl=600, show_spinner=False, max_entries=256)
+def _cached_ai_text(_ai_assistant, method_name, *args):
+    """Memoize an AIAssistant text helper by name and arguments.
+    
+    Fallback messages raise instead of returning, so a failed call is never cached.
+    """
+    result = getattr(_ai_assistant, method_name)(*args)
+    if not _ai_assistant.enabled or not result or result.startswith("AI assistance temporarily unavailable"):
+        raise RuntimeError(result or "Empty AI response")
+    return result
+
+def cached_ai_text(ai_assistant, method_name, *args):
+    """Cached AIAssistant call that falls back to the helper's own message on failure"""
+    try:
+        return _cached_ai_text(ai_assistant, method_name, *args)
+    except RuntimeError as e:
+        return str(e)
+
+def write_ai_stream(ai_assistant, chunks, spinner_text):
+    """Stream AI text into the page, showing a spinner until the first chunk arrives.
+    
+    Returns True only when generated text was written, not a fallback message.
+    """
+    chunks = iter(chunks)
+    with st.spinner(spinner_text):
+        first = next(chunks, "")
+    text = st.write_stream(itertools.chain([first], chunks))
+    return bool(ai_assistant.enabled and isinstance(text, str) and text.strip()
+                and not text.startswith("AI assistance temporarily unavailable"))
+
+@st.cache_resource(show_spinner=False)
+def get_shared_ai_assistant():
+    """One AIAssistant per process, shared by every session and page; None if it can't be created"""
+    try:
+        return AIAssistant()
+    except Exception:
+        return None
+
 class AIUIComponents:
     def __init__(self):
         # Initialize AI assistant with caching (lazy initialization)
@@ -11,15 +50,20 @@ class AIUIComponents:
     def _get_ai_assistant(self):
         """Get AI assistant with lazy initialization and error handling"""
         if self.ai_assistant is None:
-            if 'ai_assistant' not in st.session_state:
-                try:
-                    st.session_state.ai_assistant = AIAssistant()
-                except Exception as e:
-                    st.warning(t("ai_features_unavailable"))
-                    st.session_state.ai_assistant = None
-            self.ai_assistant = st.session_state.ai_assistant
+            self.ai_assistant = get_shared_ai_assistant()
+            if self.ai_assistant is None:
+                st.warning(t("ai_features_unavailable"))
         return self.ai_assistant
     
+    def _throttled(self, action_key, min_interval=0.8):
+        """True if the same AI action ran less than min_interval seconds ago in this session"""
+        now = time.monotonic()
+        last_calls = st.session_state.setdefault('ai_last_call_times', {})
+        if now - last_calls.get(action_key, 0) < min_interval:
+            return True
+        last_calls[action_key] = now
+        return False
+    
     def inline_ai_button(self, target_key, ai_function, button_text=None, help_text=None, **kwargs):
         """
         Create an inline AI assistance button that populates a text field
@@ -95,34 +139,48 @@ class AIUIComponents:
             
             with col1:
                 if st.button("Get Quick Tips", key=f"suggestions_{hash(text_content)}"):
-                    ai_assistant = self._get_ai_assistant()
-                    if ai_assistant is None:
-                        st.error("AI suggestions are currently unavailable.")
-                        return
-                    try:
-                        with st.spinner("Analyzing..."):
-                            suggestions = ai_assistant.quick_improve_suggestions(text_content, field_type)
-                            st.markdown("**Quick Improvements:**")
-                            st.markdown(suggestions)
-                    except Exception as e:
-                        st.error("Unable to get suggestions right now.")
+                    self._show_quick_tips(text_content, field_type)
             
             with col2:
                 if st.button("Improve Text", key=f"improve_full_{hash(text_content)}"):
-                    ai_assistant = self._get_ai_assistant()
-                    if ai_assistant is None:
-                        st.error("AI text improvement is currently unavailable.")
-                        return
-                    try:
-                        with st.spinner("Improving text..."):
-                            improved = ai_assistant.improve_text(text_content, "general")
-                            st.markdown("**Improved Version:**")
-                            st.text_area("Copy this improved text:", improved, height=100, key=f"improved_{hash(text_content)}")
-                            if st.button("📋 Copy to Clipboard", key=f"copy_{hash(text_content)}"):
-                                # Note: Actual clipboard functionality would need additional implementation
-                                st.info("Copy the text above to your clipboard")
-                    except Exception as e:
-                        st.error("Unable to improve text right now.")
+                    self._show_improved_text(text_content, field_type)
+    
+    def _show_quick_tips(self, text_content, field_type):
+        """Quick Tips column of ai_suggestions_panel; returning early leaves the rest of the panel intact"""
+        if self._throttled(f"suggestions_{field_type}"):
+            st.caption("Please wait a moment before asking again.")
+            return
+        ai_assistant = self._get_ai_assistant()
+        if ai_assistant is None:
+            st.error("AI suggestions are currently unavailable.")
+            return
+        try:
+            with st.spinner("Analyzing..."):
+                suggestions = cached_ai_text(ai_assistant, "quick_improve_suggestions", text_content, field_type)
+                st.markdown("**Quick Improvements:**")
+                st.markdown(suggestions)
+        except Exception as e:
+            st.error("Unable to get suggestions right now.")
+    
+    def _show_improved_text(self, text_content, field_type):
+        """Improve Text column of ai_suggestions_panel; returning early leaves the rest of the panel intact"""
+        if self._throttled(f"improve_{field_type}"):
+            st.caption("Please wait a moment before asking again.")
+            return
+        ai_assistant = self._get_ai_assistant()
+        if ai_assistant is None:
+            st.error("AI text improvement is currently unavailable.")
+            return
+        try:
+            with st.spinner("Improving text..."):
+                improved = cached_ai_text(ai_assistant, "improve_text", text_content, "general")
+                st.markdown("**Improved Version:**")
+                st.text_area("Copy this improved text:", improved, height=100, key=f"improved_{hash(text_content)}")
+                if st.button("📋 Copy to Clipboard", key=f"copy_{hash(text_content)}"):
+                    # Note: Actual clipboard functionality would need additional implementation
+                    st.info("Copy the text above to your clipboard")
+        except Exception as e:
+            st.error("Unable to improve text right now.")
     
     def message_templates_widget(self, message_type="general", product_name=None):
         """
@@ -453,14 +511,11 @@ def display_ai_success(message="AI content generated successfully!"):
 # ===== ENHANCED AI BUSINESS TOOLKIT COMPONENTS =====
 
 def get_ai_assistant():
-    """Get AI assistant instance with error handling"""
-    try:
-        if 'ai_assistant' not in st.session_state:
-            st.session_state.ai_assistant = AIAssistant()
-        return st.session_state.ai_assistant
-    except Exception as e:
+    """Get the shared AI assistant instance with error handling"""
+    ai_assistant = get_shared_ai_assistant()
+    if ai_assistant is None:
         st.warning("AI features are currently unavailable. Please check your API key configuration.")
-        return None
+    return ai_assistant
 
 def render_seo_title_generator(form_key_suffix=""):
     """Render SEO-optimized title generator"""
@@ -511,18 +566,16 @@ def render_pricing_analyzer(form_key_suffix=""):
         
         if st.form_submit_button("Analyze Pricing", type="primary"):
             if product_name and materials and time_hours > 0:
-                with st.spinner("Analyzing pricing strategy..."):
-                    try:
-                        ai = get_ai_assistant()
-                        if ai:
-                            result = ai.generate_pricing_analysis(product_name, materials, time_hours, skill_level, category)
+                try:
+                    ai = get_ai_assistant()
+                    if ai:
+                        st.markdown("**Pricing Analysis & Recommendations:**")
+                        if write_ai_stream(ai, ai.generate_pricing_analysis(product_name, materials, time_hours, skill_level, category, stream=True), "Analyzing pricing strategy..."):
                             st.success("Pricing analysis complete!")
-                            st.markdown("**Pricing Analysis & Recommendations:**")
-                            st.write(result)
-                        else:
-                            st.error("AI features are currently unavailable. Please check your API key configuration.")
-                    except Exception as e:
-                        st.error(f"Error generating pricing analysis: {str(e)}")
+                    else:
+                        st.error("AI features are currently unavailable. Please check your API key configuration.")
+                except Exception as e:
+                    st.error(f"Error generating pricing analysis: {str(e)}")
             else:
                 st.warning("Please fill in all required fields")
 
@@ -573,18 +626,16 @@ def render_seasonal_marketing_generator(form_key_suffix=""):
         
         if st.form_submit_button("Generate Marketing Content", type="primary"):
             if products_list:
-                with st.spinner("Creating seasonal marketing content..."):
-                    try:
-                        ai = get_ai_assistant()
-                        if ai:
-                            result = ai.generate_seasonal_marketing_content(products_list, season_or_holiday, target_audience)
+                try:
+                    ai = get_ai_assistant()
+                    if ai:
+                        st.markdown("**Seasonal Marketing Ideas:**")
+                        if write_ai_stream(ai, ai.generate_seasonal_marketing_content(products_list, season_or_holiday, target_audience, stream=True), "Creating seasonal marketing content..."):
                             st.success("Seasonal marketing content generated!")
-                            st.markdown("**Seasonal Marketing Ideas:**")
-                            st.write(result)
-                        else:
-                            st.error("AI features are currently unavailable. Please check your API key configuration.")
-                    except Exception as e:
-                        st.error(f"Error generating seasonal content: {str(e)}")
+                    else:
+                        st.error("AI features are currently unavailable. Please check your API key configuration.")
+                except Exception as e:
+                    st.error(f"Error generating seasonal content: {str(e)}")
             else:
                 st.warning("Please describe your products")
 
@@ -601,18 +652,16 @@ def render_brand_voice_analyzer(form_key_suffix=""):
         
         if st.form_submit_button("Analyze Brand Voice", type="primary"):
             if bio and products_description:
-                with st.spinner("Analyzing your brand voice..."):
-                    try:
-                        ai = get_ai_assistant()
-                        if ai:
-                            result = ai.generate_brand_voice_analysis(bio, products_description, target_customers)
+                try:
+                    ai = get_ai_assistant()
+                    if ai:
+                        st.markdown("**Brand Voice & Messaging Strategy:**")
+                        if write_ai_stream(ai, ai.generate_brand_voice_analysis(bio, products_description, target_customers, stream=True), "Analyzing your brand voice..."):
                             st.success("Brand voice analysis complete!")
-                            st.markdown("**Brand Voice & Messaging Strategy:**")
-                            st.write(result)
-                        else:
-                            st.error("AI features are currently unavailable. Please check your API key configuration.")
-                    except Exception as e:
-                        st.error(f"Error analyzing brand voice: {str(e)}")
+                    else:
+                        st.error("AI features are currently unavailable. Please check your API key configuration.")
+                except Exception as e:
+                    st.error(f"Error analyzing brand voice: {str(e)}")
             else:
                 st.warning("Please fill in your bio and product description")
 
@@ -632,18 +681,16 @@ def render_content_calendar_generator(form_key_suffix=""):
         
         if st.form_submit_button("Generate Content Calendar", type="primary"):
             if business_type:
-                with st.spinner("Creating your content calendar..."):
-                    try:
-                        ai = get_ai_assistant()
-                        if ai:
-                            result = ai.generate_content_calendar(business_type, posting_frequency, special_events)
+                try:
+                    ai = get_ai_assistant()
+                    if ai:
+                        st.markdown("**4-Week Content Calendar:**")
+                        if write_ai_stream(ai, ai.generate_content_calendar(business_type, posting_frequency, special_events, stream=True), "Creating your content calendar..."):
                             st.success("Content calendar generated!")
-                            st.markdown("**4-Week Content Calendar:**")
-                            st.write(result)
-                        else:
-                            st.error("AI features are currently unavailable. Please check your API key configuration.")
-                    except Exception as e:
-                        st.error(f"Error generating content calendar: {str(e)}")
+                    else:
+                        st.error("AI features are currently unavailable. Please check your API key configuration.")
+                except Exception as e:
+                    st.error(f"Error generating content calendar: {str(e)}")
             else:
                 st.warning("Please describe your business type")
 
@@ -663,18 +710,16 @@ def render_competitive_analysis_generator(form_key_suffix=""):
         
         if st.form_submit_button("Analyze Competition", type="primary"):
             if product_type and price_range and unique_features:
-                with st.spinner("Analyzing competitive landscape..."):
-                    try:
-                        ai = get_ai_assistant()
-                        if ai:
-                            result = ai.generate_competitive_analysis(product_type, price_range, unique_features)
+                try:
+                    ai = get_ai_assistant()
+                    if ai:
+                        st.markdown("**Competitive Analysis & Strategy:**")
+                        if write_ai_stream(ai, ai.generate_competitive_analysis(product_type, price_range, unique_features, stream=True), "Analyzing competitive landscape..."):
                             st.success("Competitive analysis complete!")
-                            st.markdown("**Competitive Analysis & Strategy:**")
-                            st.write(result)
-                        else:
-                            st.error("AI features are currently unavailable. Please check your API key configuration.")
-                    except Exception as e:
-                        st.error(f"Error generating competitive analysis: {str(e)}")
+                    else:
+                        st.error("AI features are currently unavailable. Please check your API key configuration.")
+                except Exception as e:
+                    st.error(f"Error generating competitive analysis: {str(e)}")
             else:
                 st.warning("Please fill in all fields")
 
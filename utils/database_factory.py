@@ -117,9 +117,20 @@ class MockDatabaseService:
         st.info("Demo mode: Message not sent (no database configured)")
         return True
     
+    def send_messages(self, messages_data, mark_read=None):
+        import streamlit as st
+        st.info("Demo mode: Messages not sent (no database configured)")
+        return True
+    
     def get_unread_message_count(self, email=None):
         return 0
     
+    def get_product_choices(self, limit=None):
+        return []
+    
+    def get_sidebar_stats(self, email=None):
+        return {'unread_count': 0, 'conversation_count': 0}
+    
     def get_analytics_summary(self):
         return {'total_events': 0, 'unique_sessions': 0, 'events_by_type': {}}
     
@@ -132,13 +143,20 @@ class MockDatabaseService:
     def get_user_by_id(self, user_id):
         return None  # No user management in demo mode
     
-    def get_conversations(self, email=None, sender_type=None):
+    def get_conversations(self, email=None, sender_type=None, unread_only=False, product_id=None,
+                          order_by='recent', limit=None, offset=0):
         return []  # No conversations in demo mode
     
+    def get_conversation_summary(self, email=None, sender_type=None, unread_only=False, product_id=None):
+        return {'conversation_count': 0, 'unread_count': 0, 'message_count': 0}
+    
     def mark_conversation_as_read(self, product_id, sender_email):
         return True  # Silent operation in demo mode
     
-    def get_message_thread(self, product_id, participant_emails):
+    def mark_conversations_as_read(self, conversations):
+        return True  # Silent operation in demo mode
+    
+    def get_message_thread(self, product_id, participant_emails, limit=None):
         return []  # No message threads in demo mode
 
 def get_database_status():
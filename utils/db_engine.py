@@ -9,19 +9,29 @@ from pathlib import Path
 
 from .config import get_database_url, get_database_mode
 
+# Engines keyed by URL so every page's database service shares one connection pool
+_engines = {}
+
 def create_db_engine():
     """
     Create SQLAlchemy engine based on configuration.
     Returns engine that works with PostgreSQL or SQLite.
+    The engine (and its connection pool) is reused for the same database URL.
     """
     database_url = get_database_url()
     database_mode = get_database_mode()
     
+    if database_url in _engines:
+        return _engines[database_url]
+    
     if database_mode == 'postgres':
         # PostgreSQL configuration
         engine = create_engine(
             database_url,
             future=True,
+            pool_size=int(os.getenv('DB_POOL_SIZE', 5)),
+            max_overflow=int(os.getenv('DB_MAX_OVERFLOW', 10)),
+            pool_recycle=1800,  # Recycle before typical server-side idle timeouts
             pool_pre_ping=True,
             echo=False  # Set to True for SQL debugging
         )
@@ -50,6 +60,7 @@ def create_db_engine():
             pool_pre_ping=True
         )
     
+    _engines[database_url] = engine
     return engine
 
 def get_database_info():
@@ -82,10 +93,10 @@ def get_database_info():
     
     return info
 
-def test_database_connection():
+def test_database_connection(engine=None):
     """Test database connection and return status"""
     try:
-        engine = create_db_engine()
+        engine = engine or create_db_engine()
         with engine.connect() as conn:
             # Test basic query
             if get_database_mode() == 'postgres':
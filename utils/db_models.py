@@ -2,7 +2,7 @@
 SQLAlchemy models for TrueCraft application.
 Cross-database compatible models that work with both PostgreSQL and SQLite.
 """
-from sqlalchemy import Column, Integer, String, Text, Numeric, DateTime, Boolean, JSON, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, Numeric, DateTime, Boolean, JSON, ForeignKey, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
@@ -122,6 +122,12 @@ class Message(Base):
     # Relationships
     user = relationship("User", back_populates="messages", foreign_keys=[sender_user_id])
     product = relationship("Product", back_populates="messages")
+    
+    # Conversation listing filters by sender and sorts by time; threads look up by product and sender
+    __table_args__ = (
+        Index('ix_messages_sender_type_timestamp', 'sender_type', 'timestamp'),
+        Index('ix_messages_product_sender', 'product_id', 'sender_email'),
+    )
 
 class Analytics(Base):
     """Analytics events for tracking user behavior"""
@@ -170,6 +176,10 @@ class OrderItem(Base):
 def create_tables(engine):
     """Create all tables in the database"""
     Base.metadata.create_all(engine)
+    # create_all skips tables that already exist, so add indexes introduced since then
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(engine, checkfirst=True)
 
 def drop_tables(engine):
     """Drop all tables in the database (use with caution!)"""
@@ -6,7 +6,7 @@ import pandas as pd
 from datetime import datetime
 from typing import Optional, List, Dict, Any
 from sqlalchemy.orm import sessionmaker, Session
-from sqlalchemy import text, desc, func, and_, or_
+from sqlalchemy import text, asc, desc, func, and_, or_, select, case, insert, update
 import streamlit as st
 
 from .db_engine import create_db_engine, test_database_connection
@@ -31,7 +31,7 @@ class DatabaseService:
             create_tables(self.engine)
             
             # Test connection
-            connection_test = test_database_connection()
+            connection_test = test_database_connection(self.engine)
             self.db_available = connection_test['success']
             
             if not self.db_available:
@@ -112,6 +112,31 @@ class DatabaseService:
         finally:
             session.close()
     
+    def get_product_choices(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Get just id, name and price of products, sorted by name, for selection widgets"""
+        if not self.db_available:
+            return []
+        
+        session = self.get_session()
+        if not session:
+            return []
+        
+        try:
+            query = select(Product.id, Product.name, Product.price).order_by(Product.name)
+            if limit:
+                query = query.limit(limit)
+            
+            return [
+                {'id': row.id, 'name': row.name, 'price': float(row.price) if row.price else 0.0}
+                for row in session.execute(query)
+            ]
+            
+        except Exception as e:
+            print(f"Error loading product choices: {str(e)}")
+            return []
+        finally:
+            session.close()
+    
     def add_product(self, product_data: Dict[str, Any], user_id: Optional[int] = None) -> bool:
         """Add a new product"""
         if not self.db_available:
@@ -503,6 +528,15 @@ class DatabaseService:
     # Message Management Methods
     def send_message(self, message_data: Dict[str, Any]) -> bool:
         """Send a message"""
+        return self.send_messages([message_data])
+    
+    def send_messages(self, messages_data: List[Dict[str, Any]],
+                      mark_read: Optional[Dict[str, Any]] = None) -> bool:
+        """Send several messages in one multi-row INSERT and a single commit
+        
+        mark_read, given as {'product_id': ..., 'sender_email': ...}, also marks
+        that conversation as read in the same transaction (e.g. when replying).
+        """
         if not self.db_available:
             return False
         
@@ -511,18 +545,23 @@ class DatabaseService:
             return False
         
         try:
-            message = Message(
-                sender_user_id=message_data.get('sender_user_id'),
-                sender_type=message_data.get('sender_type', 'buyer'),
-                sender_name=message_data['sender_name'],
-                sender_email=message_data['sender_email'],
-                product_id=message_data.get('product_id'),
-                subject=message_data['subject'],
-                message_content=message_data['message_content'],
-                is_read=message_data.get('is_read', False)
-            )
+            rows = [{
+                'sender_user_id': message_data.get('sender_user_id'),
+                'sender_type': message_data.get('sender_type', 'buyer'),
+                'sender_name': message_data['sender_name'],
+                'sender_email': message_data['sender_email'],
+                'product_id': message_data.get('product_id'),
+                'subject': message_data['subject'],
+                'message_content': message_data['message_content'],
+                'is_read': message_data.get('is_read', False)
+            } for message_data in messages_data]
+            
+            if rows:
+                session.execute(insert(Message), rows)
+            
+            if mark_read:
+                session.execute(self._mark_read_update([(mark_read['product_id'], mark_read['sender_email'])]))
             
-            session.add(message)
             session.commit()
             return True
             
@@ -558,6 +597,50 @@ class DatabaseService:
         finally:
             session.close()
     
+    def get_sidebar_stats(self, email: Optional[str] = None) -> Dict[str, int]:
+        """Get unread message and conversation counts in a single round trip"""
+        empty_stats = {'unread_count': 0, 'conversation_count': 0}
+        if not self.db_available:
+            return empty_stats
+        
+        session = self.get_session()
+        if not session:
+            return empty_stats
+        
+        try:
+            unread_query = select(func.count(Message.id)).where(Message.is_read == False)
+            if email:
+                unread_query = unread_query.where(Message.sender_email != email)
+            
+            # One row per conversation, matching the grouping used by get_conversations
+            conversations = select(Message.product_id).join(
+                Product, Message.product_id == Product.id
+            ).group_by(
+                Message.product_id,
+                Message.sender_email,
+                Message.sender_name,
+                Message.sender_type
+            ).subquery()
+            conversation_query = select(func.count()).select_from(conversations)
+            
+            result = session.execute(
+                select(
+                    unread_query.scalar_subquery().label('unread_count'),
+                    conversation_query.scalar_subquery().label('conversation_count')
+                )
+            ).one()
+            
+            return {
+                'unread_count': result.unread_count or 0,
+                'conversation_count': result.conversation_count or 0
+            }
+            
+        except Exception as e:
+            print(f"Error getting sidebar stats: {str(e)}")
+            return empty_stats
+        finally:
+            session.close()
+    
     # User Management Methods
     def get_user_by_id(self, user_id: int) -> Optional[Dict[str, Any]]:
         """Get user by ID"""
@@ -591,8 +674,27 @@ class DatabaseService:
             session.close()
     
     # Conversation Management Methods
-    def get_conversations(self, email: Optional[str] = None, sender_type: Optional[str] = None) -> List[Dict[str, Any]]:
-        """Get conversations grouped by product and participants"""
+    def _conversation_filters(self, email: Optional[str] = None, sender_type: Optional[str] = None,
+                              product_id: Optional[int] = None) -> list:
+        """WHERE conditions shared by the conversation list and summary queries"""
+        conditions = []
+        if email:
+            conditions.append(Message.sender_email == email)
+        if sender_type:
+            conditions.append(Message.sender_type == sender_type)
+        if product_id is not None:
+            conditions.append(Message.product_id == product_id)
+        return conditions
+    
+    def get_conversations(self, email: Optional[str] = None, sender_type: Optional[str] = None,
+                          unread_only: bool = False, product_id: Optional[int] = None,
+                          order_by: str = 'recent', limit: Optional[int] = None,
+                          offset: int = 0) -> List[Dict[str, Any]]:
+        """Get conversations grouped by product and participants
+        
+        Filtering, ordering ('recent', 'oldest' or 'most_messages') and paging
+        are done in SQL so only the requested slice is returned.
+        """
         if not self.db_available:
             return []
         
@@ -601,6 +703,13 @@ class DatabaseService:
             return []
         
         try:
+            message_count = func.count()
+            last_message_time = func.max(Message.timestamp)
+            unread_count = func.sum(case((Message.is_read == False, 1), else_=0))
+            
+            # One representative subject per conversation, portable across dialects
+            first_subject = func.min(Message.subject)
+            
             # Build the query with joins
             query = session.query(
                 Message.product_id,
@@ -608,23 +717,14 @@ class DatabaseService:
                 Message.sender_email,
                 Message.sender_name,
                 Message.sender_type,
-                func.count().label('message_count'),
-                func.max(Message.timestamp).label('last_message_time'),
-                func.sum(
-                    func.case(
-                        [(Message.is_read == False, 1)],
-                        else_=0
-                    )
-                ).label('unread_count'),
-                func.string_agg(func.distinct(Message.subject), '; ').label('subjects')
+                message_count.label('message_count'),
+                last_message_time.label('last_message_time'),
+                unread_count.label('unread_count'),
+                first_subject.label('first_subject')
             ).join(Product, Message.product_id == Product.id)
             
             # Apply filters
-            if email:
-                query = query.filter(Message.sender_email == email)
-            
-            if sender_type:
-                query = query.filter(Message.sender_type == sender_type)
+            query = query.filter(*self._conversation_filters(email, sender_type, product_id))
             
             # Group and order
             query = query.group_by(
@@ -633,7 +733,20 @@ class DatabaseService:
                 Message.sender_email,
                 Message.sender_name,
                 Message.sender_type
-            ).order_by(desc('last_message_time'))
+            )
+            
+            if unread_only:
+                query = query.having(unread_count > 0)
+            
+            order_columns = {
+                'recent': desc(last_message_time),
+                'oldest': asc(last_message_time),
+                'most_messages': desc(message_count)
+            }
+            query = query.order_by(order_columns.get(order_by, order_columns['recent']))
+            
+            if limit is not None:
+                query = query.limit(limit).offset(offset)
             
             results = query.all()
             
@@ -648,7 +761,7 @@ class DatabaseService:
                     'message_count': result.message_count,
                     'last_message_time': result.last_message_time,
                     'unread_count': result.unread_count or 0,
-                    'subjects': result.subjects or ''
+                    'first_subject': result.first_subject or ''
                 })
             
             return conversations
@@ -659,27 +772,75 @@ class DatabaseService:
         finally:
             session.close()
     
+    def get_conversation_summary(self, email: Optional[str] = None, sender_type: Optional[str] = None,
+                                 unread_only: bool = False, product_id: Optional[int] = None) -> Dict[str, int]:
+        """Get conversation, unread and message totals for the same filters as get_conversations"""
+        empty_summary = {'conversation_count': 0, 'unread_count': 0, 'message_count': 0}
+        if not self.db_available:
+            return empty_summary
+        
+        session = self.get_session()
+        if not session:
+            return empty_summary
+        
+        try:
+            unread_count = func.sum(case((Message.is_read == False, 1), else_=0))
+            grouped = select(
+                func.count().label('message_count'),
+                unread_count.label('unread_count')
+            ).join(
+                Product, Message.product_id == Product.id
+            ).where(
+                *self._conversation_filters(email, sender_type, product_id)
+            ).group_by(
+                Message.product_id,
+                Product.name,
+                Message.sender_email,
+                Message.sender_name,
+                Message.sender_type
+            )
+            if unread_only:
+                grouped = grouped.having(unread_count > 0)
+            grouped = grouped.subquery()
+            
+            result = session.execute(
+                select(
+                    func.count().label('conversation_count'),
+                    func.coalesce(func.sum(grouped.c.unread_count), 0).label('unread_count'),
+                    func.coalesce(func.sum(grouped.c.message_count), 0).label('message_count')
+                ).select_from(grouped)
+            ).one()
+            
+            return {
+                'conversation_count': result.conversation_count,
+                'unread_count': int(result.unread_count),
+                'message_count': int(result.message_count)
+            }
+            
+        except Exception as e:
+            print(f"Error getting conversation summary: {str(e)}")
+            return empty_summary
+        finally:
+            session.close()
+    
     def mark_conversation_as_read(self, product_id: int, sender_email: str) -> bool:
         """Mark all messages in a conversation as read"""
+        return self.mark_conversations_as_read([(product_id, sender_email)])
+    
+    def mark_conversations_as_read(self, conversations: List[tuple]) -> bool:
+        """Mark several conversations, given as (product_id, sender_email) pairs, as read in one UPDATE"""
         if not self.db_available:
             return False
         
+        if not conversations:
+            return True
+        
         session = self.get_session()
         if not session:
             return False
         
         try:
-            messages = session.query(Message).filter(
-                and_(
-                    Message.product_id == product_id,
-                    Message.sender_email == sender_email
-                )
-            ).all()
-            
-            for message in messages:
-                message.is_read = True
-                message.updated_at = datetime.now()
-            
+            session.execute(self._mark_read_update(conversations))
             session.commit()
             return True
             
@@ -690,8 +851,23 @@ class DatabaseService:
         finally:
             session.close()
     
-    def get_message_thread(self, product_id: int, participant_emails: List[str]) -> List[Dict[str, Any]]:
-        """Get message thread between specific participants for a product"""
+    def _mark_read_update(self, conversations: List[tuple]):
+        """UPDATE statement marking the unread messages of the given conversations as read"""
+        # Only touch unread rows so already-read messages aren't rewritten
+        return update(Message).where(
+            or_(*[
+                and_(Message.product_id == product_id, Message.sender_email == sender_email)
+                for product_id, sender_email in conversations
+            ]),
+            Message.is_read == False
+        ).values(is_read=True, updated_at=datetime.now())
+    
+    def get_message_thread(self, product_id: int, participant_emails: List[str],
+                           limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Get message thread between specific participants for a product
+        
+        With a limit, only the most recent messages are returned (still oldest first).
+        """
         if not self.db_available:
             return []
         
@@ -700,14 +876,21 @@ class DatabaseService:
             return []
         
         try:
-            messages = session.query(Message, Product.name.label('product_name')).join(
+            query = session.query(Message, Product.name.label('product_name')).join(
                 Product, Message.product_id == Product.id
             ).filter(
                 and_(
                     Message.product_id == product_id,
                     Message.sender_email.in_(participant_emails)
                 )
-            ).order_by(Message.timestamp.asc()).all()
+            )
+            
+            if limit is not None:
+                # Newest first in SQL so LIMIT keeps the latest messages, then restore order
+                messages = query.order_by(Message.timestamp.desc(), Message.id.desc()).limit(limit).all()
+                messages.reverse()
+            else:
+                messages = query.order_by(Message.timestamp.asc()).all()
             
             thread = []
             for message, product_name in messages:
@@ -0,0 +1,39 @@
+"""
+Constants for the voice onboarding flow.
+Kept in a module so they are built once per process instead of on every page rerun.
+"""
+from types import MappingProxyType
+
+LANGUAGES = (
+    "English", "Spanish", "French", "Hindi", "Mandarin", "Arabic", 
+    "Portuguese", "Bengali", "Russian", "Japanese", "German", "Italian"
+)
+
+ONBOARDING_STEPS = (
+    "welcome",
+    "craft_expertise", 
+    "business_goals",
+    "product_portfolio",
+    "cultural_heritage",
+    "sustainability",
+    "pricing_strategy",
+    "market_positioning"
+)
+
+STEP_TITLES = MappingProxyType({
+    "welcome": "🌟 Welcome to TrueCraft",
+    "craft_expertise": "🎨 Your Craft & Expertise", 
+    "business_goals": "🎯 Business Goals",
+    "product_portfolio": "📦 Product Portfolio",
+    "cultural_heritage": "🏛️ Cultural Heritage",
+    "sustainability": "🌱 Sustainability Practices",
+    "pricing_strategy": "💰 Pricing Strategy",
+    "market_positioning": "📈 Market Positioning"
+})
+
+NUM_STEPS = len(ONBOARDING_STEPS)
+
+# Step titles in step order, so the page can index them by step number
+STEP_TITLES_BY_INDEX = tuple(STEP_TITLES[step] for step in ONBOARDING_STEPS)
+
+__all__ = ['LANGUAGES', 'ONBOARDING_STEPS', 'STEP_TITLES', 'NUM_STEPS', 'STEP_TITLES_BY_INDEX']